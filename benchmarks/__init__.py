@@ -0,0 +1 @@
+"""Micro-benchmarks of the data functions behind the dashboard pages."""
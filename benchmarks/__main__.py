@@ -0,0 +1,78 @@
+"""Benchmark the data functions of the dashboard pages.
+
+Usage::
+
+    python -m benchmarks [--only NAME ...] [--repeat N] [--output PATH]
+                         [--baseline PATH] [--tolerance FRACTION] [--update-baseline]
+
+Prints the median time and peak memory of every case, saves the report
+under ``data_store/benchmarks/`` and compares it with the baseline; exits
+with status 1 when a case got slower, used more memory or failed, and with
+status 2 when there is no baseline to compare with.
+
+The committed baseline is measured on the reference inputs, the synthetic
+data of ``python -m data synth DIR`` at the default scale and seed::
+
+    python -m data synth /tmp/trail-ref
+    TRAIL_DATA_DIR=/tmp/trail-ref python -m benchmarks
+"""
+
+import argparse
+
+from .cases import CASES
+from .runner import BASELINE, REPEAT, TOLERANCE, compare, load, regressions, run, save
+
+
+def _row(name, case, base, status):
+    if "seconds" not in case:
+        return f"{name:<24} {case.get('skipped') or case.get('failed')}"
+    line = f"{name:<24} {case['seconds'] * 1000:>10.1f} ms {case['peak_bytes'] / 2**20:>9.1f} MB"
+    if base and "seconds" in base:
+        line += (f"   baseline {base['seconds'] * 1000:>10.1f} ms {base['peak_bytes'] / 2**20:>9.1f} MB"
+                 f" ({case['seconds'] / base['seconds'] - 1:+.0%})")
+    return line + (f"   {status}" if status else "")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--only", choices=list(CASES), action="append", metavar="NAME",
+                        help="only run this case (repeatable)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help=f"timed calls per case (default: {REPEAT})")
+    parser.add_argument("--output", help="report path (default: a new file under data_store/benchmarks/)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline report to compare with")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"allowed slowdown or memory growth as a fraction (default: {TOLERANCE})")
+    parser.add_argument("--update-baseline", action="store_true", help="save the report as the new baseline")
+    args = parser.parse_args(argv)
+
+    report = run(args.only, repeat=args.repeat)
+    try:
+        baseline = load(args.baseline)
+    except FileNotFoundError:
+        baseline = None
+    statuses = compare(report, baseline, args.tolerance) if baseline else {}
+    for name, case in report["cases"].items():
+        base = baseline["cases"].get(name) if baseline else None
+        print(_row(name, case, base, statuses.get(name)))
+    print(f"Report saved to {save(report, args.output)}")
+
+    if args.update_baseline:
+        if baseline:
+            # Keep the baseline of the cases that were not run
+            report = {**report, "cases": {**baseline["cases"], **report["cases"]}}
+        print(f"Baseline saved to {save(report, args.baseline)}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; nothing was compared. "
+              "Run with --update-baseline to record one.")
+        raise SystemExit(2)
+    elif not any(status not in ("new", "inputs changed", "skipped") for status in statuses.values()):
+        print("No case ran on the inputs of the baseline, so nothing was compared; "
+              "the baseline is measured on `python -m data synth DIR` (see the README).")
+    failed = regressions(statuses) if baseline else [n for n, c in report["cases"].items() if "failed" in c]
+    if failed:
+        print(f"{len(failed)} regressed: {', '.join(failed)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
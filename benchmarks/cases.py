@@ -0,0 +1,96 @@
+"""The benchmarked data functions of the dashboard pages.
+
+Every case pairs a setup, which loads its fixed inputs from the data store
+and is not timed, with the call that is timed. Page-level functions
+(``create_hiker_graph``, ``get_monthly_emotion_trends``, ...) are defined in
+the page scripts and cannot be imported, so the cases time the ``data``
+functions they are built on, called the way the pages call them.
+"""
+
+from functools import partial
+
+from data import EMOTIONS, HIKER_RELATIONS, JOURNAL, TOP_10, TOP_10_EXTRACTION, frame, table
+from data.access import SOURCES
+from data.communities import build_communities, community_activeness, load_communities
+from data.emotions import cube_slice, daily_dominant, emotion_cube
+from data.paths import RELATIONS_JSON
+from data.relations import read_relations, year_graphs
+from data.trail_magic import build_trail_magic_counts, trail_magic_per_mile
+from data.trajectories import Trajectories
+
+# Emotion order of the Emotions Dashboard
+EMOTION_ORDER = ['joy', 'surprise', 'sadness', 'fear', 'disgust', 'anger']
+
+
+def _relations():
+    return (read_relations(RELATIONS_JSON),)
+
+
+def _journal():
+    table(JOURNAL)
+    return ()
+
+
+def _activeness():
+    df = frame(JOURNAL, columns=["date", "normalized_name"])
+    return df[df["date"].notna()], load_communities()
+
+
+def _emotion_datasets():
+    return ({
+        "top_10": frame(TOP_10),
+        "emotions": frame(EMOTIONS),
+        "top_10_extraction": frame(TOP_10_EXTRACTION),
+    },)
+
+
+def _top_10():
+    return frame(TOP_10), EMOTION_ORDER
+
+
+def _emotion_cube():
+    cube = emotion_cube(*_emotion_datasets())
+    return cube, sorted(cube.index.unique("year"))
+
+
+def _emotion_charts(cube, years):
+    # The slices behind get_monthly_emotion_trends and its siblings, every year
+    for year in years:
+        m = cube_slice(cube, "top_10", year)
+        m[m["dominant"]]
+        m.groupby("label")["count"].sum().sort_values(ascending=False, kind="stable")
+        cube_slice(cube, "emotions", year)
+        cube_slice(cube, "top_10_extraction", year)
+
+
+def _year_positions():
+    # All hikers of the latest year with communities, as one animation grid
+    year = max(int(year) for year in load_communities()["years"])
+    return (frame(JOURNAL, columns=["normalized_name", "date", "Latitude", "Longitude"], years=[year]),)
+
+
+# name -> (tables read by the setup, setup, timed function)
+CASES = {
+    # Page 4, Louvain tab (load_cleaned_hiker_relations, build_graph)
+    "read_relations": ([HIKER_RELATIONS], lambda: (RELATIONS_JSON,), read_relations),
+    "year_graphs": ([HIKER_RELATIONS], _relations, year_graphs),
+    # Page 4, the yearly Louvain runs behind the Statistics and Louvain tabs
+    "build_communities": ([HIKER_RELATIONS], lambda: (RELATIONS_JSON,), build_communities),
+    # Page 4, Statistics tab
+    "community_activeness": ([JOURNAL, HIKER_RELATIONS], _activeness, community_activeness),
+    # Page 4, Animations tab
+    "trajectories": ([JOURNAL, HIKER_RELATIONS], _year_positions, Trajectories.from_entries),
+    # Page 6 (load_emotion_cube, get_monthly_emotion_trends and its siblings)
+    "emotion_cube": ([TOP_10, EMOTIONS, TOP_10_EXTRACTION], _emotion_datasets, emotion_cube),
+    "emotion_charts": ([TOP_10, EMOTIONS, TOP_10_EXTRACTION], _emotion_cube, _emotion_charts),
+    # Page 6, Individual Journeys (load_daily_dominant behind create_hiker_graph)
+    "daily_dominant": ([TOP_10], _top_10, partial(daily_dominant, hiker="Hiker trail name")),
+    # Page 2, trail magic per mile
+    "trail_magic_counts": ([JOURNAL], _journal, build_trail_magic_counts),
+    "trail_magic_per_mile": ([JOURNAL], _journal, trail_magic_per_mile),
+}
+
+
+def source_files(names) -> list:
+    """Raw input files of the tables ``names``."""
+    return sorted({path for name in names for path in SOURCES[name][0]})
@@ -0,0 +1,156 @@
+"""Timing, peak memory and baseline comparison of the benchmark cases.
+
+Every case is called once to warm up, then ``repeat`` times under
+``time.perf_counter``; the median is the reported time. One more call runs
+under ``tracemalloc`` for the peak of memory allocated by Python and NumPy
+during the call (Arrow buffers are not traced). Reports record the SHA-256
+of the input files of every case, and a case is only compared with a
+baseline measured on the same inputs.
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from data.fingerprint import file_sha256, is_lfs_pointer
+from data.paths import DATA_DIR, STORE_DIR
+
+from .cases import CASES, source_files
+
+RESULTS_DIR = STORE_DIR / "benchmarks"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+REPEAT = 5
+# A case regresses when its time or peak memory exceeds the baseline by more than this fraction
+TOLERANCE = 0.25
+# Smaller differences are noise
+MIN_SECONDS = 0.005
+MIN_BYTES = 1 << 20
+
+
+def measure(func, args, repeat=REPEAT) -> dict:
+    """Wall time and peak traced memory of ``func(*args)``."""
+    func(*args)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "repeat": repeat,
+        "peak_bytes": peak,
+    }
+
+
+def _digest(path, digests):
+    key = str(path.relative_to(DATA_DIR))
+    if key not in digests:
+        digests[key] = file_sha256(path) if path.exists() else None
+    return key, digests[key]
+
+
+def run(names=None, repeat=REPEAT) -> dict:
+    """Benchmark report of the cases ``names`` (all by default).
+
+    A case with a missing input file, an input that is still a Git LFS
+    pointer, or a failing setup is reported as skipped; a case whose timed
+    call fails is reported as failed.
+    """
+    names = list(CASES) if names is None else list(names)
+    digests = {}
+    cases = {}
+    for name in names:
+        tables, setup, func = CASES[name]
+        paths = source_files(tables)
+        case = {"inputs": dict(_digest(path, digests) for path in paths)}
+        unusable = [
+            f"{path.name} is missing" if not path.exists() else f"{path.name} is a Git LFS pointer"
+            for path in paths if not path.exists() or is_lfs_pointer(path)
+        ]
+        if unusable:
+            case["skipped"] = "; ".join(unusable)
+            cases[name] = case
+            continue
+        try:
+            args = setup()
+        except Exception as e:
+            case["skipped"] = f"{type(e).__name__}: {e}"
+        else:
+            try:
+                case.update(measure(func, args, repeat))
+            except Exception as e:
+                case["failed"] = f"{type(e).__name__}: {e}"
+        cases[name] = case
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "cases": cases,
+    }
+
+
+def save(report, path=None) -> Path:
+    """Write ``report`` to ``path``, by default a new file under ``data_store/benchmarks/``."""
+    if path is None:
+        stamp = report["created"].replace(":", "").replace("-", "")
+        path = RESULTS_DIR / f"{stamp}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    return path
+
+
+def load(path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _exceeds(value, base, tolerance, floor) -> bool:
+    return value - base > max(base * tolerance, floor)
+
+
+def compare(report, baseline, tolerance=TOLERANCE) -> dict:
+    """Status of every case of ``report`` against ``baseline``.
+
+    The status is one of ``ok``, ``slower``, ``more memory``, ``slower, more
+    memory``, ``new`` (not in the baseline), ``inputs changed`` (measured on
+    other input files), ``skipped`` or ``failed``.
+    """
+    statuses = {}
+    for name, case in report["cases"].items():
+        base = baseline["cases"].get(name)
+        if "skipped" in case or "failed" in case:
+            statuses[name] = "skipped" if "skipped" in case else "failed"
+        elif base is None or "seconds" not in base:
+            statuses[name] = "new"
+        elif base["inputs"] != case["inputs"]:
+            statuses[name] = "inputs changed"
+        else:
+            problems = []
+            if _exceeds(case["seconds"], base["seconds"], tolerance, MIN_SECONDS):
+                problems.append("slower")
+            if _exceeds(case["peak_bytes"], base["peak_bytes"], tolerance, MIN_BYTES):
+                problems.append("more memory")
+            statuses[name] = ", ".join(problems) or "ok"
+    return statuses
+
+
+def regressions(statuses) -> list:
+    """Cases of ``compare`` that got slower, used more memory or failed."""
+    return [name for name, status in statuses.items()
+            if status.startswith(("slower", "more memory")) or status == "failed"]
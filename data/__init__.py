@@ -0,0 +1,33 @@
+"""Shared data access for the dashboard pages."""
+
+from .access import (
+    EMOTIONS,
+    HIKER_RELATIONS,
+    INTERACTIONS,
+    JOURNAL,
+    TOP_10,
+    TOP_10_EXTRACTION,
+    frame,
+    signature,
+    table,
+)
+from .interactions import SOCIALNESS_GROUPS, interaction_mask, interaction_rows
+from .journal import ensure_journal_store, ingest_journal, normalize_names
+
+__all__ = [
+    "EMOTIONS",
+    "HIKER_RELATIONS",
+    "INTERACTIONS",
+    "JOURNAL",
+    "SOCIALNESS_GROUPS",
+    "TOP_10",
+    "TOP_10_EXTRACTION",
+    "ensure_journal_store",
+    "frame",
+    "ingest_journal",
+    "interaction_mask",
+    "interaction_rows",
+    "normalize_names",
+    "signature",
+    "table",
+]
@@ -0,0 +1,145 @@
+"""Offline build steps for the data store.
+
+Usage::
+
+    python -m data ingest [--force]
+    python -m data communities [--force | --update]
+    python -m data choropleth [--year YEAR ...] [--force] [--jobs N]
+    python -m data maps [--force] [--only NAME ...] [--jobs N]
+    python -m data animations --year YEAR [--group ID ...] [--jobs N] [--force]
+    python -m data synth OUT_DIR [--scale FACTOR] [--seed N]
+"""
+
+import argparse
+import time
+
+from .animations import render_year
+from .build import ARTIFACTS, build_artifacts
+from .choropleth import YEARS, choropleth_name
+from .communities import build_communities, load_communities, update_communities, write_communities
+from .journal import ensure_journal_store, ingest_journal
+from .synth import generate
+
+
+def _ingest(args):
+    start = time.perf_counter()
+    rows = ingest_journal() if args.force else ensure_journal_store()
+    if rows is None:
+        print(f"Journal store is up to date ({time.perf_counter() - start:.1f}s)")
+    else:
+        print(f"Ingested {rows:,} journal entries in {time.perf_counter() - start:.1f}s")
+
+
+def _communities(args):
+    start = time.perf_counter()
+    if args.force or args.update:
+        communities = update_communities() if args.update else build_communities()
+        write_communities(communities)
+    else:
+        communities = load_communities()
+    for year, info in communities["years"].items():
+        print(f"{year}: {info['count']} communities, modularity {info['modularity']:.3f}")
+    print(f"Community artifact ready in {time.perf_counter() - start:.1f}s")
+
+
+def _report(results, start):
+    for name, result in results.items():
+        if result is None:
+            print(f"{name}: up to date")
+        elif isinstance(result, Exception):
+            print(f"{name}: failed ({type(result).__name__}: {result})")
+        else:
+            print(f"{name}: {result:.1f}s")
+    built = [r for r in results.values() if isinstance(r, float)]
+    failed = sum(isinstance(r, Exception) for r in results.values())
+    print(f"Built {len(built)} artifacts ({sum(built):.1f}s of work) in {time.perf_counter() - start:.1f}s"
+          + (f", {failed} failed" if failed else ""))
+    if failed:
+        raise SystemExit(1)
+
+
+def _choropleth(args):
+    start = time.perf_counter()
+    names = [choropleth_name(year) for year in args.year or YEARS]
+    _report(build_artifacts(names, force=args.force, jobs=args.jobs), start)
+
+
+def _maps(args):
+    start = time.perf_counter()
+    _report(build_artifacts(args.only, force=args.force, jobs=args.jobs), start)
+
+
+def _animations(args):
+    start = time.perf_counter()
+    results = render_year(args.year, args.group, jobs=args.jobs, force=args.force)
+    for group, result in results.items():
+        if result is None:
+            print(f"Group {group}: cached")
+        elif isinstance(result, Exception):
+            print(f"Group {group}: failed ({type(result).__name__}: {result})")
+        else:
+            print(f"Group {group}: {result:.1f}s")
+    rendered = [r for r in results.values() if isinstance(r, float)]
+    failed = sum(isinstance(r, Exception) for r in results.values())
+    print(f"Rendered {len(rendered)} animations ({sum(rendered):.1f}s of work) in {time.perf_counter() - start:.1f}s"
+          + (f", {failed} failed" if failed else ""))
+    if failed:
+        raise SystemExit(1)
+
+
+def _synth(args):
+    start = time.perf_counter()
+    rows = generate(args.out_dir, scale=args.scale, seed=args.seed)
+    for name, count in rows.items():
+        print(f"{name}: {count:,} rows")
+    print(f"Generated {args.scale:g}x synthetic inputs in {time.perf_counter() - start:.1f}s; "
+          f"use them with TRAIL_DATA_DIR={args.out_dir}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m data", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="convert the journal CSV into the Parquet store")
+    ingest.add_argument("--force", action="store_true", help="rebuild even if the store is current")
+    ingest.set_defaults(func=_ingest)
+
+    comms = commands.add_parser("communities", help="precompute yearly Louvain communities")
+    mode = comms.add_mutually_exclusive_group()
+    mode.add_argument("--force", action="store_true", help="rebuild from scratch even if the artifact is current")
+    mode.add_argument("--update", action="store_true",
+                      help="rebuild warm-started from the latest artifact, keeping its community ids")
+    comms.set_defaults(func=_communities)
+
+    choropleth = commands.add_parser("choropleth", help="prerender the trail magic per mile map of every year")
+    choropleth.add_argument("--year", type=int, action="append", help="only build this year (repeatable)")
+    choropleth.add_argument("--force", action="store_true", help="rebuild even the maps that are current")
+    choropleth.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    choropleth.set_defaults(func=_choropleth)
+
+    build = commands.add_parser("maps", help="rebuild the pre-rendered maps and charts whose inputs changed")
+    build.add_argument("--force", action="store_true", help="rebuild even the artifacts that are current")
+    build.add_argument("--only", choices=list(ARTIFACTS), action="append", metavar="NAME",
+                       help="only build this artifact (repeatable)")
+    build.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    build.set_defaults(func=_maps)
+
+    anims = commands.add_parser("animations", help="render the community movement animations of a year")
+    anims.add_argument("--year", type=int, required=True, help="year of the communities to animate")
+    anims.add_argument("--group", type=int, action="append", help="only render this group (repeatable)")
+    anims.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    anims.add_argument("--force", action="store_true", help="render even the cached animations")
+    anims.set_defaults(func=_animations)
+
+    synth = commands.add_parser("synth", help="write synthetic raw inputs for scale testing")
+    synth.add_argument("out_dir", help="folder to write the inputs to")
+    synth.add_argument("--scale", type=float, default=1.0, help="volume relative to the real inputs (default: 1)")
+    synth.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    synth.set_defaults(func=_synth)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
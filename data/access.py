@@ -0,0 +1,186 @@
+"""Process-wide, memory-mapped Arrow tables shared by every Streamlit session.
+
+Each dataset is materialized once as an uncompressed Arrow IPC file under
+``data_store/arrow`` and then memory-mapped. The mapped table is kept in a
+module-level registry, so all sessions and pages of the server process read
+the same pages of the OS page cache instead of holding their own pandas copy.
+Pandas frames are only created on demand for the projection a page needs.
+
+The journal tables follow the year partitions of the Parquet store
+(``data.journal``): every year is built from its own partition into its own
+file, ``data_store/arrow/<name>/<year>.arrow``, so building one never holds
+more than a year in memory, and a year slice only touches the files of its
+years. The whole table is the zero-copy concatenation of the years.
+"""
+
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from . import journal
+from .paths import (
+    ARROW_DIR,
+    EMOTIONS_XLSX,
+    JOURNAL_CSV,
+    RELATIONS_JSON,
+    TOP_10_EXTRACTION_XLSX,
+    TOP_10_SHEET,
+    TOP_10_XLSX,
+)
+from .relations import read_relations
+from .workbooks import WORKBOOK_VERSION, read_sheet_table
+
+JOURNAL = "journal"
+EMOTIONS = "emotions"
+TOP_10 = "top_10"
+TOP_10_EXTRACTION = "top_10_extraction"
+HIKER_RELATIONS = "hiker_relations"
+INTERACTIONS = "interactions"
+
+# Bump whenever the layout of a table built here changes
+TABLE_VERSION = 2
+
+# Tables stored per year -> their dataset in the journal store
+PARTITIONED = {JOURNAL: journal.ENTRIES, INTERACTIONS: journal.INTERACTIONS}
+
+
+def _build_journal_year(name, year) -> pa.Table:
+    dataset = journal.journal_dataset(name=PARTITIONED[name])
+    # The IPC file format needs one dictionary per column for the whole file
+    return dataset.to_table(filter=ds.field("year") == year).unify_dictionaries()
+
+
+def _build_relations() -> pa.Table:
+    return pa.Table.from_pandas(read_relations(RELATIONS_JSON), preserve_index=False, schema=pa.schema([
+        ("year", pa.int16()), ("src", pa.string()), ("dst", pa.string()),
+    ]))
+
+
+# name -> (source files, builder); the builders of PARTITIONED tables take the year
+SOURCES = {
+    JOURNAL: ([JOURNAL_CSV], lambda year: _build_journal_year(JOURNAL, year)),
+    INTERACTIONS: ([JOURNAL_CSV], lambda year: _build_journal_year(INTERACTIONS, year)),
+    EMOTIONS: ([EMOTIONS_XLSX], lambda: read_sheet_table(EMOTIONS_XLSX)),
+    TOP_10: ([TOP_10_XLSX], lambda: read_sheet_table(TOP_10_XLSX, TOP_10_SHEET)),
+    TOP_10_EXTRACTION: ([TOP_10_EXTRACTION_XLSX], lambda: read_sheet_table(TOP_10_EXTRACTION_XLSX)),
+    HIKER_RELATIONS: ([RELATIONS_JSON], _build_relations),
+}
+
+_lock = threading.Lock()
+_tables = {}  # name -> (source signature, {year or None: memory-mapped table})
+
+
+def source_signature(paths) -> tuple:
+    return tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in paths)
+
+
+def signature(name) -> list:
+    """JSON-friendly identity of the sources of ``name`` and the store layout."""
+    return [[journal.STORE_VERSION, WORKBOOK_VERSION, TABLE_VERSION]] + [list(s) for s in source_signature(SOURCES[name][0])]
+
+
+def _arrow_paths(name) -> dict:
+    """Stored files of ``name``, by year for the PARTITIONED tables, else under None."""
+    if name not in PARTITIONED:
+        path = ARROW_DIR / f"{name}.arrow"
+        return {None: path} if path.exists() else {}
+    return {int(path.stem): path for path in (ARROW_DIR / name).glob("*.arrow")}
+
+
+def _write(table, path, current) -> None:
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"source_signature": json.dumps(current).encode(),
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    # Sessions still holding the old mapping keep reading the old inode
+    tmp.replace(path)
+
+
+def _materialize(name, current) -> None:
+    if name not in PARTITIONED:
+        _write(SOURCES[name][1](), ARROW_DIR / f"{name}.arrow", current)
+        return
+    years = journal.journal_years(name=PARTITIONED[name])
+    # The single file of the layout before the tables were split per year
+    (ARROW_DIR / f"{name}.arrow").unlink(missing_ok=True)
+    for year in years:
+        _write(SOURCES[name][1](year), ARROW_DIR / name / f"{year}.arrow", current)
+    for year, path in _arrow_paths(name).items():
+        if year not in years:
+            path.unlink(missing_ok=True)
+
+
+def _open(path) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def _stored_signature(name):
+    """Signature every stored file of ``name`` was built from, if they agree."""
+    signatures = set()
+    for path in _arrow_paths(name).values():
+        metadata = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema.metadata or {}
+        signatures.add(metadata.get(b"source_signature"))
+    if len(signatures) != 1 or None in signatures:
+        return None
+    return json.loads(signatures.pop())
+
+
+def _parts(name) -> dict:
+    """Memory-mapped tables of ``name``, opened once per process.
+
+    They are rebuilt when one of the source files changes on disk.
+    """
+    current = signature(name)
+    with _lock:
+        cached = _tables.get(name)
+        if cached is not None and cached[0] == current:
+            return cached[1]
+        if _stored_signature(name) != current:
+            _materialize(name, current)
+        parts = {year: _open(path) for year, path in sorted(_arrow_paths(name).items())}
+        _tables[name] = (current, parts)
+        return parts
+
+
+def _concat(tables, schema) -> pa.Table:
+    return pa.concat_tables(tables) if tables else schema.empty_table()
+
+
+def table(name) -> pa.Table:
+    """Memory-mapped Arrow table for ``name``, the years of a PARTITIONED table concatenated."""
+    parts = list(_parts(name).values())
+    return parts[0] if len(parts) == 1 else pa.concat_tables(parts)
+
+
+def frame(name, columns=None, years=None) -> pd.DataFrame:
+    """Pandas view of a shared table, restricted to ``columns`` and ``years``.
+
+    The columns are projected before the rows are filtered, so only the
+    requested columns are copied out of the mapped files.
+    """
+    parts = _parts(name)
+    if name in PARTITIONED:
+        schema = next(iter(parts.values())).schema
+        chosen = parts.values() if years is None else [parts[y] for y in sorted({int(y) for y in years}) if y in parts]
+        t = _concat([part if columns is None else part.select(columns) for part in chosen],
+                    schema if columns is None else pa.schema([schema.field(c) for c in columns]))
+        return t.to_pandas()
+
+    t = parts[None]
+    if years is None:
+        return (t if columns is None else t.select(columns)).to_pandas()
+    keep = None if columns is None else list(columns) + ([] if "year" in columns else ["year"])
+    t = t if keep is None else t.select(keep)
+    t = t.filter(pc.is_in(t["year"], value_set=pa.array([int(y) for y in years], t["year"].type)))
+    if columns is not None and "year" not in columns:
+        t = t.drop_columns(["year"])
+    return t.to_pandas()
@@ -0,0 +1,257 @@
+"""Movement animations of the hiker communities, rendered on demand.
+
+The Animations tab used to show a fixed set of hand-made
+``static_mp4s/Group_<id>_<year>.mp4`` files. ``render_animation`` draws the
+animation of any (group, year) from the journal store and the community
+artifact (``data.communities``): every member's journal positions are
+interpolated onto a daily grid (``data.trajectories``), and each frame shows
+the members of that day and the group's center on the trail states.
+
+Videos are cached under ``data_store/animations/<key>/``, where the key
+changes with the journal store and the community artifact, so a cached video is
+reused until the data changes. Rendering never runs in the server's
+threads: ``request_animation`` submits one animation to a small process pool
+shared by the whole server and returns a future the page polls, and
+``render_year`` (``python -m data animations``) renders every group of a
+year ahead of time in parallel in a process pool of its own.
+
+Frames are piped to ffmpeg as MP4; without an ffmpeg binary the animations
+are written as GIFs instead.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from matplotlib import animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+from .access import JOURNAL, frame, signature
+from .communities import artifact_id, load_communities
+from .geo import load_trail_states
+from .paths import ANIMATIONS_DIR
+from .trajectories import Trajectories
+
+# Bump whenever the rendered animation changes
+ANIMATION_VERSION = 2
+FPS = 12
+DPI = 100
+FIGSIZE = (6, 7)
+# Groups smaller than this are not offered for animation
+MIN_GROUP_SIZE = 2
+# Days of the group center's trail drawn behind it
+TRAIL_DAYS = 14
+GIF_COLORS = 64
+HIKER_COLOR = "tab:blue"
+CENTER_COLOR = "tab:red"
+
+_lock = threading.Lock()
+_pool = None
+_pending = {}  # path -> future of its render, until it is done
+
+
+def animation_format() -> str:
+    return "mp4" if animation.writers.is_available("ffmpeg") else "gif"
+
+
+def group_sizes(communities, year) -> dict:
+    """Size of every community of ``year`` that is large enough to animate."""
+    info = communities["years"][str(year)]
+    return {cid: size for cid, size in zip(info["ids"], info["sizes"]) if size >= MIN_GROUP_SIZE}
+
+
+def _cache_dir(communities):
+    current = json.dumps([signature(JOURNAL), artifact_id(communities)])
+    key = hashlib.sha256(f"{ANIMATION_VERSION}:{current}".encode()).hexdigest()[:16]
+    return ANIMATIONS_DIR / key
+
+
+def animation_path(communities, year, group):
+    """Cache path of the animation of ``group`` in ``year``; it may not exist yet."""
+    return _cache_dir(communities) / f"Group_{group}_{year}.{animation_format()}"
+
+
+def group_entries(communities, year, group) -> pd.DataFrame:
+    """Dated positions of the members of ``group`` in ``year``.
+
+    Returns ``normalized_name``, ``date``, ``Latitude`` and ``Longitude``.
+    """
+    partition = communities["years"][str(year)]["partition"]
+    members = [hiker for hiker, cid in partition.items() if cid == group]
+    df = frame(JOURNAL, columns=["normalized_name", "date", "Latitude", "Longitude"], years=[year])
+    df = df[df["normalized_name"].isin(members)].dropna(subset=["date", "Latitude", "Longitude"])
+    return df.astype({"normalized_name": str}).reset_index(drop=True)
+
+
+def _map_axes():
+    """Figure with the trail states, the legend and the extent of the animation."""
+    fig = Figure(figsize=FIGSIZE, dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0.02, 0.02, 0.96, 0.9])
+    states = load_trail_states()
+    states.plot(ax=ax, color="#e8f0e0", edgecolor="#6b7b6b", linewidth=0.8)
+    west, south, east, north = states.total_bounds
+    ax.set_xlim(west - 0.5, east + 0.5)
+    ax.set_ylim(south - 0.5, north + 0.5)
+    ax.set_aspect(1 / np.cos(np.radians((south + north) / 2)))
+    ax.set_axis_off()
+    ax.scatter([], [], s=18, color=HIKER_COLOR, alpha=0.7, label="Hikers")
+    ax.scatter([], [], s=80, color=CENTER_COLOR, marker="*", label="Group center")
+    ax.legend(loc="lower right", frameon=False)
+    return fig, ax
+
+
+def _write_video(frames, path, size) -> None:
+    """Encode RGBA ``frames`` of ``size`` (width, height) to ``path``."""
+    if path.suffix == ".mp4":
+        width, height = size
+        command = [
+            animation.writers["ffmpeg"].bin_path(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(FPS), "-i", "-",
+            "-vcodec", "libx264", "-pix_fmt", "yuv420p", str(path),
+        ]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as ffmpeg:
+            for pixels in frames:
+                ffmpeg.stdin.write(pixels.tobytes())
+            ffmpeg.stdin.close()
+        if ffmpeg.returncode:
+            raise RuntimeError(f"ffmpeg exited with status {ffmpeg.returncode}")
+    else:
+        # One palette for all frames: quantizing each frame on its own dominates the render
+        palette = None
+        images = []
+        for pixels in frames:
+            image = Image.fromarray(pixels).convert("RGB")
+            if palette is None:
+                palette = image.quantize(colors=GIF_COLORS, method=Image.Quantize.FASTOCTREE)
+            images.append(image.quantize(palette=palette, dither=Image.Dither.NONE))
+        images[0].save(path, save_all=True, append_images=images[1:], duration=round(1000 / FPS), loop=0)
+
+
+def render_animation(year, group, path, communities=None) -> float:
+    """Render the animation of ``group`` in ``year`` to ``path``.
+
+    The map is drawn once; every frame restores it and draws only the moving
+    markers on top. Returns the render time. Raises ``ValueError`` when none
+    of the group's hikers has a dated journal position that year.
+    """
+    start = time.perf_counter()
+    communities = communities or load_communities()
+    entries = group_entries(communities, year, group)
+    if entries.empty:
+        raise ValueError(f"Group {group} has no dated journal positions in {year}")
+    trajectories = Trajectories.from_entries(entries)
+    dates, tracks = trajectories.dates, trajectories.positions
+    centroids, spreads, _ = trajectories.group_stats(np.zeros(len(trajectories.hikers), dtype=int))
+    center, spread = centroids[0], spreads[0]
+
+    fig, ax = _map_axes()
+    hikers = ax.scatter([], [], s=18, color=HIKER_COLOR, alpha=0.7, animated=True)
+    path_line, = ax.plot([], [], color=CENTER_COLOR, linewidth=1.5, alpha=0.6, animated=True)
+    centroid = ax.scatter([], [], s=80, color=CENTER_COLOR, marker="*", zorder=3, animated=True)
+    title = fig.text(0.5, 0.96, "", ha="center", va="center", fontsize=12, animated=True)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+
+    def frames():
+        for i in range(len(dates)):
+            positions = tracks[:, i]
+            positions = positions[~np.isnan(positions[:, 0])]
+            hikers.set_offsets(positions[:, ::-1] if len(positions) else np.empty((0, 2)))
+            recent = center[max(0, i - TRAIL_DAYS):i + 1]
+            path_line.set_data(recent[:, 1], recent[:, 0])
+            centroid.set_offsets(center[i:i + 1, ::-1] if not np.isnan(center[i, 0]) else np.empty((0, 2)))
+            label = f"Group {group}: {dates[i]:%b %d, %Y} ({len(positions)} hikers"
+            title.set_text(label + (f", spread {spread[i]:.0f} km)" if len(positions) > 1 else ")"))
+            fig.canvas.restore_region(background)
+            for artist in (path_line, hikers, centroid, title):
+                fig.draw_artist(artist)
+            yield np.asarray(fig.canvas.buffer_rgba())
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp{path.suffix}")
+    _write_video(frames(), tmp, fig.canvas.get_width_height())
+    tmp.replace(path)
+    return time.perf_counter() - start
+
+
+def _submit(*args):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2),
+                                    mp_context=multiprocessing.get_context("spawn"))
+    # Streamlit runs the page as ``__main__``, which spawned workers would
+    # import and run again; they are started (in ``submit``) without it
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        return _pool.submit(*args)
+    except BrokenProcessPool:
+        # A worker died; later requests get a fresh pool
+        _pool = None
+        return _submit(*args)
+    finally:
+        sys.modules["__main__"] = main
+
+
+def request_animation(year, group, communities=None):
+    """Render the animation of ``group`` in ``year`` in a worker process.
+
+    Workers are spawned interpreters in a pool shared by the whole process,
+    half as many as there are CPUs. Returns a future of the render time that
+    is done once the video is at ``animation_path``, or that raises the
+    render's exception, such as ``ValueError`` for a group without
+    positions. Concurrent requests for one animation share a job.
+    """
+    communities = communities or load_communities()
+    path = animation_path(communities, year, group)
+    with _lock:
+        future = _pending.get(path)
+        if future is None:
+            future = _submit(render_animation, year, group, path)
+            _pending[path] = future
+            future.add_done_callback(lambda f: _pending.pop(path, None))
+    return future
+
+
+def render_year(year, groups=None, jobs=None, force=False) -> dict:
+    """Render the animations of ``groups`` (all of ``year`` by default) in parallel.
+
+    Returns, per group, the render time, None if the cached video was
+    current, or the exception its job raised.
+    """
+    communities = load_communities()
+    groups = sorted(group_sizes(communities, year)) if groups is None else list(groups)
+    # Materialize the journal table before the workers map it
+    frame(JOURNAL, columns=["year"], years=[year])
+    results = {}
+    todo = {}
+    for group in groups:
+        path = animation_path(communities, year, group)
+        if path.exists() and not force:
+            results[group] = None
+        else:
+            todo[group] = path
+    if not todo:
+        return results
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(todo))) as pool:
+        futures = {pool.submit(render_animation, year, group, path): group for group, path in todo.items()}
+        for future in as_completed(futures):
+            group = futures[future]
+            try:
+                results[group] = future.result()
+            except Exception as e:
+                results[group] = e
+    return dict(sorted(results.items()))
@@ -0,0 +1,244 @@
+"""Reproducible build of the pre-rendered maps and charts.
+
+``ARTIFACTS`` lists every HTML document the pages embed, with the input
+files it is made from and its renderer. ``build_artifacts`` renders the
+stale ones in a process pool, one job per artifact, into
+``data_store/maps/``. An artifact is stale when the SHA-256 of one of its
+inputs or of its renderer's module, or that module's version in
+``RENDERER_VERSIONS``, differs from the one recorded in ``manifest.json``
+when it was built. Digests are remembered per file size and
+mtime, so the journal CSV is only re-hashed after it changed.
+
+Pages call ``map_path``, which never renders while they wait: a missing or
+stale artifact is rebuilt on a background thread, and meanwhile the page is
+served the last built file or, failing that, the hand-made document of the
+same name committed at the repository root. The committed document is also
+served when the inputs are missing or still Git LFS pointers, or when
+rendering fails; ``ArtifactUnavailable`` is raised when there is none. The
+build step is optional but keeps the first page load current.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+from . import choropleth, emotion_maps, maps
+from .access import INTERACTIONS, JOURNAL, table
+from .choropleth import YEARS, choropleth_name, render_choropleth
+from .emotion_maps import render_emotion_map
+from .fingerprint import file_sha256, is_lfs_pointer
+from .paths import BEST_SPOTS_CSV, DATA_DIR, JOURNAL_CSV, MAPS_DIR, ROOT, TRAIL_STATES_GEOJSON, WORST_SPOTS_CSV
+from .trail_magic import trail_magic_counts
+
+MANIFEST = MAPS_DIR / "manifest.json"
+# Renderer module -> version of what it renders. Only the module's own source
+# is hashed, so bump its version when a change to the modules it builds on
+# changes the output.
+RENDERER_VERSIONS = {
+    maps: maps.MAPS_VERSION,
+    choropleth: choropleth.CHOROPLETH_VERSION,
+    emotion_maps: emotion_maps.EMOTION_MAP_VERSION,
+}
+
+_JOURNAL_INPUTS = [JOURNAL_CSV, TRAIL_STATES_GEOJSON]
+
+# name -> (input files, renderer)
+ARTIFACTS = {
+    "best and worst spots.html": ([BEST_SPOTS_CSV, WORST_SPOTS_CSV, TRAIL_STATES_GEOJSON], maps.render_spots_map),
+    "trail magic state map.html": (_JOURNAL_INPUTS, maps.render_trail_magic_map),
+    "trail_magic_per_mile_map.html": (_JOURNAL_INPUTS, render_choropleth),
+    "top trail magic locations each state map.html": (_JOURNAL_INPUTS, maps.render_top_trail_magic_map),
+    "neg_emotions_markers_NOBO.html": (_JOURNAL_INPUTS, partial(render_emotion_map, "NOBO")),
+    "neg_emotions_markers_SOBO.html": (_JOURNAL_INPUTS, partial(render_emotion_map, "SOBO")),
+    "interactive_hikers_map.html": ([JOURNAL_CSV], maps.render_hiker_density_map),
+    "social_interactions_density.html": ([JOURNAL_CSV], maps.render_social_density_map),
+    "bar_chart_socialness.html": ([JOURNAL_CSV], maps.render_socialness_bar_chart),
+    "line_chart_socialness.html": ([JOURNAL_CSV], maps.render_socialness_line_chart),
+    **{choropleth_name(year): (_JOURNAL_INPUTS, partial(render_choropleth, year)) for year in YEARS},
+}
+
+_lock = threading.Lock()
+# Background rebuilds of map_path, one at a time
+_rebuilds = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+_pending = set()
+_failed = {}  # name -> (key, exception) of the last failed rebuild
+
+
+class ArtifactUnavailable(RuntimeError):
+    """No version of an artifact can be served.
+
+    ``building`` tells whether one is being rendered.
+    """
+
+    def __init__(self, message, building=False):
+        super().__init__(message)
+        self.building = building
+
+
+def _read_manifest() -> dict:
+    try:
+        with open(MANIFEST) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"inputs": {}, "artifacts": {}}
+
+
+def _write_manifest(manifest) -> None:
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp.replace(MANIFEST)
+
+
+def _relative(path) -> str:
+    # Raw inputs may live outside the repository (TRAIL_DATA_DIR)
+    return str(path.relative_to(DATA_DIR if path.is_relative_to(DATA_DIR) else ROOT))
+
+
+def _digest(path, inputs) -> str:
+    """SHA-256 of ``path``, reused from ``inputs`` while its size and mtime hold."""
+    stat = path.stat()
+    key = _relative(path)
+    known = inputs.get(key)
+    if known is None or (known["size"], known["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        known = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+        inputs[key] = known
+    return known["sha256"]
+
+
+def artifact_key(name, inputs) -> str:
+    """Content hash of everything artifact ``name`` is built from.
+
+    ``inputs`` is the manifest's digest table, updated in place.
+    """
+    inputs_of, renderer = ARTIFACTS[name]
+    module = sys.modules[getattr(renderer, "func", renderer).__module__]
+    paths = inputs_of + [Path(module.__file__).resolve()]
+    digests = [[_relative(p), _digest(p, inputs)] for p in paths]
+    return hashlib.sha256(json.dumps([RENDERER_VERSIONS[module], digests]).encode()).hexdigest()
+
+
+def _render(name) -> float:
+    """Render artifact ``name`` into the maps folder. Returns the build time."""
+    start = time.perf_counter()
+    html = ARTIFACTS[name][1]()
+    path = MAPS_DIR / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".html.tmp")
+    tmp.write_text(html, encoding="utf-8")
+    tmp.replace(path)
+    return time.perf_counter() - start
+
+
+def _is_current(name, manifest, key) -> bool:
+    built = manifest["artifacts"].get(name)
+    return built is not None and built["key"] == key and (MAPS_DIR / name).exists()
+
+
+def _prepare_journal() -> None:
+    # Materialize the shared tables once, so the workers only read them
+    table(JOURNAL)
+    table(INTERACTIONS)
+    trail_magic_counts()
+
+
+def build_artifacts(names=None, force=False, jobs=None) -> dict:
+    """Render the stale artifacts of ``names`` (all by default) in parallel.
+
+    Returns, for every artifact in ``names``, its build time in seconds,
+    None if it was up to date, or the exception its job raised; a failed
+    job does not stop the others.
+    """
+    names = list(ARTIFACTS) if names is None else list(names)
+    with _lock:
+        manifest = _read_manifest()
+        keys = {name: artifact_key(name, manifest["inputs"]) for name in names}
+        results = {name: None for name in names}
+        stale = [name for name in names if force or not _is_current(name, manifest, keys[name])]
+        _write_manifest(manifest)
+        if not stale:
+            return results
+        if any(JOURNAL_CSV in ARTIFACTS[name][0] for name in stale):
+            _prepare_journal()
+
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(stale))) as pool:
+            futures = {pool.submit(_render, name): name for name in stale}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = e
+                    continue
+                manifest["artifacts"][name] = {"key": keys[name], "seconds": round(results[name], 3)}
+                _write_manifest(manifest)
+        return results
+
+
+def _unusable_inputs(name) -> list:
+    return [
+        f"{path.name} is missing" if not path.exists() else f"{path.name} is a Git LFS pointer"
+        for path in ARTIFACTS[name][0] if not path.exists() or is_lfs_pointer(path)
+    ]
+
+
+def _rebuild(name, key) -> None:
+    try:
+        seconds = _render(name)
+    except Exception as e:
+        with _lock:
+            _failed[name] = (key, e)
+            _pending.discard(name)
+        return
+    with _lock:
+        manifest = _read_manifest()
+        manifest["artifacts"][name] = {"key": key, "seconds": round(seconds, 3)}
+        _write_manifest(manifest)
+        _failed.pop(name, None)
+        _pending.discard(name)
+
+
+def map_path(name) -> Path:
+    """Path of the best available version of artifact ``name``.
+
+    That is the built artifact if it is current. Otherwise a rebuild is
+    started in the background and the last built file, or the committed one
+    at the repository root, is returned until it is done.
+    """
+    unusable = _unusable_inputs(name)
+    error = None
+    if not unusable:
+        with _lock:
+            manifest = _read_manifest()
+            known = dict(manifest["inputs"])
+            key = artifact_key(name, manifest["inputs"])
+            if manifest["inputs"] != known:
+                # Remember new digests so they are not recomputed
+                _write_manifest(manifest)
+            if _is_current(name, manifest, key):
+                return MAPS_DIR / name
+            failed_key, error = _failed.get(name, (None, None))
+            if failed_key != key:
+                error = None
+                if name not in _pending:
+                    _pending.add(name)
+                    _rebuilds.submit(_rebuild, name, key)
+
+    for path in (MAPS_DIR / name, ROOT / name):
+        if path.exists():
+            return path
+    if unusable:
+        raise ArtifactUnavailable(f"{name} cannot be built: {'; '.join(unusable)}.")
+    if error is not None:
+        raise ArtifactUnavailable(f"Rendering {name} failed ({type(error).__name__}: {error}).")
+    raise ArtifactUnavailable(
+        f"{name} is being built. Reload the page in a moment, or build every map "
+        "ahead of time with `python -m data maps`.",
+        building=True,
+    )
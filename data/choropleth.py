@@ -0,0 +1,62 @@
+"""Trail-magic-per-mile choropleth maps, for all years and one per year.
+
+Rendering a folium choropleth serializes the state geometry on the server,
+which used to happen on every year selection. The map of every year is a
+build artifact of its own (``choropleth_name``, see ``data.build``), so it
+is rendered once per change of the journal and served as a file.
+"""
+
+import folium
+
+from .geo import load_trail_states
+from .trail_magic import trail_magic_per_mile
+
+# Bump whenever the rendered map changes
+CHOROPLETH_VERSION = 1
+YEARS = range(2013, 2024)
+
+
+def choropleth_name(year) -> str:
+    """Artifact name of the map of ``year``."""
+    return f"trail_magic_per_mile_{year}.html"
+
+
+def render_choropleth(year=None) -> str:
+    """Full HTML document of the trail magic per mile map for ``year``.
+
+    With ``year`` None the map covers all years, as on the per-mile tab.
+    """
+    state_counts = trail_magic_per_mile(year)
+    states = load_trail_states()
+    states = states.merge(state_counts, left_on='name', right_on='State', how='left')
+    states["Trail Magic per Mile"] = states["Trail Magic per Mile"].fillna(0)
+
+    m = folium.Map(location=[39.5, -77.5], zoom_start=5, tiles='OpenStreetMap')
+    folium.Choropleth(
+        geo_data=states.to_json(),
+        name="Trail Magic per Mile",
+        data=states,
+        columns=["name", "Trail Magic per Mile"],
+        key_on="feature.properties.name",
+        fill_color="YlGnBu",
+        fill_opacity=0.7,
+        line_opacity=0.5,
+        legend_name="Trail Magic Events per Mile",
+        highlight=True
+    ).add_to(m)
+
+    folium.GeoJson(
+        states,
+        tooltip=folium.GeoJsonTooltip(
+            fields=["name", "Trail Magic Count", "Trail Miles", "Trail Magic per Mile"],
+            aliases=["State: ", "Trail Magic Count: ", "Trail Miles: ", "Per Mile: "],
+            localize=True
+        )
+    ).add_to(m)
+
+    if year is None:
+        title = "<h3 align='center' style='font-size:20px; margin-top:6px;'>Trail Magic Occurrences per Mile in Each State</h3>"
+    else:
+        title = f"<h4 align='center' style='font-size:18px;'>Trail Magic per Mile in {year}</h4>"
+    m.get_root().html.add_child(folium.Element(title))
+    return m.get_root().render()
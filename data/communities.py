@@ -0,0 +1,317 @@
+"""Precomputed Louvain communities of the yearly hiker relation graphs.
+
+``build_communities`` runs Louvain over the years of the relations edge
+table (see ``data.relations``) in order and records each year's
+partition, community sizes, community count and modularity. The result is
+stored as a JSON artifact whose name carries the artifact version and the
+SHA-256 of the relations file, so ``load_communities`` only rebuilds when
+that file changes.
+
+The years are chained rather than independent:
+
+* each year's Louvain run is warm-started from the previous year's
+  partition for the hikers present in both years;
+* community ids are stable across years: a community keeps the id of the
+  previous year's community it shares the most hikers with, and new
+  communities get fresh ids, so ``Group_<id>`` means the same group in
+  every year;
+* an explicit update (``python -m data communities --update``) reuses the
+  latest earlier artifact: years whose relations are unchanged keep their
+  partition, and changed years are re-run starting from their previous
+  partition instead of from scratch. The result then depends on that parent
+  artifact, whose SHA-256 it records as ``parent_sha256``. Artifacts built on
+  demand by ``load_communities`` start cold, so they only depend on the
+  relations file.
+
+Each year also carries the precomputed node positions of its graph view
+(``data.layout``), keyed by hiker.
+"""
+
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+
+import community.community_louvain as community_louvain
+import networkx as nx
+import numpy as np
+import pandas as pd
+from filelock import FileLock
+
+from .fingerprint import file_sha256
+from .layout import LAYOUT_VERSION, community_layout
+from .paths import COMMUNITIES_DIR, RELATIONS_JSON
+from .relations import read_relations, year_graphs
+
+# Bump whenever the artifact layout or the detection parameters change
+ARTIFACT_VERSION = 3
+RANDOM_STATE = 42
+
+_file_locks = {}  # artifact path -> FileLock
+_loaded = {}  # relations path -> ((mtime_ns, size), artifact path, its mtime_ns, artifact)
+
+
+def artifact_path(source_sha256):
+    return COMMUNITIES_DIR / f"communities-v{ARTIFACT_VERSION}.{LAYOUT_VERSION}-{source_sha256[:16]}.json"
+
+
+def relations_digest(edges: pd.DataFrame) -> str:
+    """Order-independent digest of one year's mentions."""
+    pairs = sorted(zip(edges["src"], edges["dst"].fillna("")))
+    return hashlib.sha256(json.dumps(pairs).encode()).hexdigest()
+
+
+def _mention_graph(edges: pd.DataFrame) -> nx.Graph:
+    # Only hikers with mentions are part of the community graph
+    linked = edges.dropna(subset=["dst"])
+    return nx.Graph(list(zip(linked["src"], linked["dst"])))
+
+
+def _warm_start(G, *partitions) -> dict:
+    """Initial partition of ``G`` from earlier partitions.
+
+    A node takes its community from the first partition that knows it;
+    nodes unknown to all of them start alone. Communities of different
+    partitions are kept apart.
+    """
+    labels = {}
+    init = {}
+    for node in G.nodes:
+        key = next(((i, p[node]) for i, p in enumerate(partitions) if p and node in p), (None, node))
+        init[node] = labels.setdefault(key, len(labels))
+    return init
+
+
+def _stable_ids(partition: dict, previous: dict, next_id: int):
+    """Relabel ``partition`` with the ids of the overlapping ``previous`` communities.
+
+    Pairs of (new, previous) communities are matched greedily by the number
+    of shared hikers; unmatched communities get fresh ids from ``next_id``,
+    the largest first. Returns the relabeled partition and the next free id.
+    """
+    members = {}
+    for node, cid in partition.items():
+        members.setdefault(cid, []).append(node)
+
+    overlap = {}
+    for node, cid in partition.items():
+        if node in previous:
+            pair = (cid, previous[node])
+            overlap[pair] = overlap.get(pair, 0) + 1
+    mapping = {}
+    taken = set()
+    for (cid, old), _ in sorted(overlap.items(), key=lambda kv: (-kv[1], kv[0][1], min(members[kv[0][0]]))):
+        if cid not in mapping and old not in taken:
+            mapping[cid] = old
+            taken.add(old)
+
+    for cid in sorted(set(members) - set(mapping), key=lambda c: (-len(members[c]), min(members[c]))):
+        mapping[cid] = next_id
+        next_id += 1
+    return {node: mapping[cid] for node, cid in partition.items()}, next_id
+
+
+def _summary(G, partition) -> dict:
+    sizes = {}
+    for cid in partition.values():
+        sizes[cid] = sizes.get(cid, 0) + 1
+    ids = sorted(sizes)
+    modularity = community_louvain.modularity(partition, G) if G.number_of_edges() else 0.0
+    return {
+        "partition": partition,
+        "ids": ids,
+        "sizes": [sizes[cid] for cid in ids],
+        "count": len(ids),
+        "modularity": modularity,
+    }
+
+
+def node_groups(graph, year_communities) -> np.ndarray:
+    """Community of every node of ``graph`` (a ``HikerGraph``), in node order.
+
+    Hikers without mentions are not in the partition; each gets a community
+    of its own, numbered after the year's largest id.
+    """
+    partition = year_communities["partition"]
+    groups = np.full(graph.num_nodes, -1)
+    positions = graph.positions(list(partition))
+    found = positions >= 0
+    groups[positions[found]] = np.fromiter(partition.values(), dtype=int, count=len(partition))[found]
+    missing = groups < 0
+    next_cid = max(year_communities["ids"], default=-1) + 1
+    groups[missing] = np.arange(next_cid, next_cid + missing.sum())
+    return groups
+
+
+def build_communities(path=RELATIONS_JSON, previous=None, previous_sha256=None) -> dict:
+    """Community artifact of the relations file at ``path``.
+
+    ``previous`` is an earlier artifact of the same version; its years with
+    unchanged relations are reused and the others are warm-started from it.
+    ``previous_sha256`` is the SHA-256 of its file, recorded as the parent.
+    """
+    edges = read_relations(path)
+    graphs = year_graphs(edges)
+    cached = previous["years"] if previous and previous.get("version") == ARTIFACT_VERSION else {}
+
+    years = {}
+    prior = {}
+    next_id = 0
+    for year, year_edges in edges.groupby("year", sort=True):
+        year = str(year)
+        digest = relations_digest(year_edges)
+        G = _mention_graph(year_edges)
+        old = cached.get(year)
+        reuse = old is not None and old["digest"] == digest
+        if reuse:
+            partition = old["partition"]
+        else:
+            # Start from this year's previous partition, then last year's
+            start = _warm_start(G, old["partition"] if old else None, prior)
+            partition = community_louvain.best_partition(G, partition=start, random_state=RANDOM_STATE)
+        partition, next_id = _stable_ids(partition, prior, next_id)
+        years[year] = {"digest": digest, **_summary(G, partition)}
+        if reuse and old.get("layout_version") == LAYOUT_VERSION:
+            layout = old["layout"]
+        else:
+            graph = graphs[int(year)]
+            xy = community_layout(graph, node_groups(graph, years[year]), seed=RANDOM_STATE)
+            layout = dict(zip(graph.names.tolist(), xy.tolist()))
+        years[year].update(layout_version=LAYOUT_VERSION, layout=layout)
+        prior = partition
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "source_sha256": file_sha256(path),
+        "parent_sha256": previous_sha256 if cached else None,
+        "next_id": next_id,
+        "years": years,
+    }
+
+
+def latest_artifact():
+    """Path of the most recently written artifact of the current version, if any."""
+    paths = sorted(COMMUNITIES_DIR.glob(f"communities-v{ARTIFACT_VERSION}.*-*.json"),
+                   key=lambda p: p.stat().st_mtime_ns)
+    return paths[-1] if paths else None
+
+
+def update_communities(path=RELATIONS_JSON) -> dict:
+    """Community artifact of ``path`` warm-started from the latest artifact."""
+    previous = latest_artifact()
+    if previous is None:
+        return build_communities(path)
+    with open(previous) as f:
+        return build_communities(path, previous=json.load(f), previous_sha256=file_sha256(previous))
+
+
+def artifact_id(communities: dict) -> str:
+    """Identity of an artifact, for caching what is derived from it."""
+    name = artifact_path(communities["source_sha256"]).name
+    parent = communities.get("parent_sha256")
+    return f"{name}+{parent[:16]}" if parent else name
+
+
+def _artifact_lock(path) -> FileLock:
+    """Lock on the artifact ``path`` shared with other sessions and processes."""
+    key = str(path)
+    if key not in _file_locks:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _file_locks[key] = FileLock(path.with_name(path.name + ".lock"))
+    return _file_locks[key]
+
+
+def write_communities(artifact: dict) -> None:
+    path = artifact_path(artifact["source_sha256"])
+    with _artifact_lock(path):
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as f:
+            json.dump(artifact, f)
+        Path(f.name).replace(path)
+
+
+def load_communities(path=RELATIONS_JSON) -> dict:
+    """Community artifact for the current relations file.
+
+    Built from scratch if missing, so that it only depends on the relations
+    file; ``update_communities`` builds incrementally instead. Concurrent
+    callers wait for a single build. The artifact is read once per process
+    and again only when the size or mtime of the relations file changes.
+    """
+    stat = Path(path).stat()
+    current = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(str(path))
+    # The artifact itself is rewritten by ``python -m data communities --force/--update``
+    if cached is not None and cached[0] == current and _mtime(cached[1]) == cached[2]:
+        return cached[3]
+
+    artifact = artifact_path(file_sha256(path))
+    if not artifact.exists():
+        with _artifact_lock(artifact):
+            # Another session or process may have built it while we waited
+            if not artifact.exists():
+                write_communities(build_communities(path))
+    mtime = _mtime(artifact)
+    with open(artifact) as f:
+        communities = json.load(f)
+    _loaded[str(path)] = (current, artifact, mtime, communities)
+    return communities
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def community_members(communities: dict) -> pd.DataFrame:
+    """One row per (year, hiker) with the hiker's community id."""
+    return pd.DataFrame(
+        [
+            (year, hiker, cid)
+            for year, info in communities["years"].items()
+            for hiker, cid in info["partition"].items()
+        ],
+        columns=["year", "normalized_name", "community"],
+    )
+
+
+def community_activeness(journal: pd.DataFrame, communities: dict) -> pd.DataFrame:
+    """Size and journal entry count of every community, for all years at once.
+
+    ``journal`` needs ``date`` and ``normalized_name`` columns. Entries are
+    counted once per (year, hiker) with a single grouped count over the
+    journal rows, then summed per community through the hiker -> community
+    mapping, so the cost is linear in the number of rows rather than in
+    rows x communities. Returns one row per (year, community) with columns
+    ``year``, ``community``, ``size`` and ``entries``, ordered by year and
+    community id.
+    """
+    dated = journal[journal["date"].notna()]
+    per_hiker = (
+        dated.groupby([dated["date"].dt.year.rename("year"), "normalized_name"], observed=True)
+        .size()
+        .rename("entries")
+        .reset_index()
+    )
+    # Cast the (year, hiker) keys only after the rows have been reduced
+    per_hiker["year"] = per_hiker["year"].astype(str)
+    per_hiker["normalized_name"] = per_hiker["normalized_name"].astype(str)
+    members = community_members(communities)
+    entries = (
+        members.merge(per_hiker, on=["year", "normalized_name"], how="left")
+        .groupby(["year", "community"])["entries"]
+        .sum()
+    )
+
+    sizes = pd.DataFrame(
+        [
+            (year, cid, size)
+            for year, info in communities["years"].items()
+            for cid, size in zip(info["ids"], info["sizes"])
+        ],
+        columns=["year", "community", "size"],
+    )
+    stats = sizes.merge(entries.reset_index(), on=["year", "community"], how="left")
+    stats["entries"] = stats["entries"].fillna(0).astype("int64")
+    return stats.sort_values(["year", "community"], ignore_index=True)
@@ -0,0 +1,188 @@
+"""Clustered maps of the negative emotions of NOBO and SOBO hikers.
+
+The hand-made ``neg_emotions_markers_*.html`` maps embed one Leaflet marker
+per journal entry (2,900 for NOBO), which the browser draws all at once.
+``render_emotion_map`` builds the same map from the journal store with the
+markers clustered on the server: for every zoom level the entries are
+binned on a pixel grid in Web Mercator, and each cell becomes one marker
+carrying its entry count and per-emotion counts. The page script keeps only
+these compact arrays and draws the cells of the current zoom level that lie
+in the visible extent, redrawing on pan and zoom.
+
+A hiker's direction is taken from the sign of the latitude trend of their
+entries within a year: northbound (NOBO) hikers move north over time.
+"""
+
+import json
+
+import folium
+import numpy as np
+import pandas as pd
+
+from .access import JOURNAL, frame
+from .geo import load_trail_states
+
+# Bump whenever the rendered maps change without a change to this file
+EMOTION_MAP_VERSION = 1
+DIRECTIONS = ("NOBO", "SOBO")
+# Negative emotions and their marker colors, as in the legend on page 2
+NEGATIVE_EMOTIONS = {"sadness": "blue", "disgust": "green", "anger": "orange", "fear": "red"}
+# Zoom levels with their own clustering; deeper zooms show every location
+CLUSTER_ZOOMS = range(3, 12)
+CELL_PIXELS = 48
+TILE_PIXELS = 256
+
+
+def hiker_directions(df: pd.DataFrame) -> pd.DataFrame:
+    """Direction of every (year, hiker) from the slope of latitude over time.
+
+    ``df`` needs ``year``, ``normalized_name``, ``date`` and ``Latitude``.
+    Hikers with fewer than two dated positions, or no north-south trend, are
+    left out.
+    """
+    d = df.dropna(subset=["date", "Latitude"])
+    keys = [d["year"], d["normalized_name"]]
+    t = (d["date"] - pd.Timestamp("1970-01-01")) / pd.Timedelta(days=1)
+    lat = d["Latitude"]
+    # slope sign = sign of cov(t, lat) = sign(sum(t*lat) - sum(t)*sum(lat)/n)
+    sums = pd.DataFrame({"t": t, "lat": lat, "tlat": t * lat}).groupby(keys, observed=True).agg(["sum", "count"])
+    n = sums[("t", "count")]
+    cov = sums[("tlat", "sum")] - sums[("t", "sum")] * sums[("lat", "sum")] / n
+    cov = cov[(n >= 2) & (cov != 0)]
+    directions = pd.Series(np.where(cov > 0, "NOBO", "SOBO"), index=cov.index, name="direction")
+    return directions.reset_index()
+
+
+def negative_emotion_entries(direction) -> pd.DataFrame:
+    """Latitude, longitude and label of the negative entries of one direction."""
+    df = frame(JOURNAL, columns=["year", "normalized_name", "date", "Latitude", "Longitude", "label"])
+    directions = hiker_directions(df)
+    hikers = directions.loc[directions["direction"] == direction, ["year", "normalized_name"]]
+    df = df.merge(hikers.astype({"normalized_name": df["normalized_name"].dtype}), on=["year", "normalized_name"])
+    df = df[df["label"].isin(list(NEGATIVE_EMOTIONS))].dropna(subset=["Latitude", "Longitude"])
+    return df[["Latitude", "Longitude", "label"]].astype({"label": str}).reset_index(drop=True)
+
+
+def _mercator_pixels(lat, lon, zoom):
+    scale = TILE_PIXELS * 2.0 ** zoom
+    x = (lon + 180.0) / 360.0 * scale
+    phi = np.radians(np.clip(lat, -85.0511, 85.0511))
+    y = (1.0 - np.log(np.tan(phi) + 1.0 / np.cos(phi)) / np.pi) / 2.0 * scale
+    return x, y
+
+
+def _aggregate(groups, lat, lon, codes, n_labels) -> np.ndarray:
+    """Rows of [lat, lon, count, count per label] for every group id."""
+    keys, inverse = np.unique(groups, return_inverse=True)
+    n = len(keys)
+    count = np.bincount(inverse, minlength=n)
+    rows = np.empty((n, 3 + n_labels))
+    rows[:, 0] = np.bincount(inverse, weights=lat, minlength=n) / count
+    rows[:, 1] = np.bincount(inverse, weights=lon, minlength=n) / count
+    rows[:, 2] = count
+    rows[:, 3:] = np.bincount(inverse * n_labels + codes, minlength=n * n_labels).reshape(n, n_labels)
+    return rows
+
+
+def cluster_levels(lat, lon, codes, n_labels, zooms=CLUSTER_ZOOMS) -> dict:
+    """Grid clusters of the points at every zoom level.
+
+    Returns ``{zoom: rows}`` where each row is ``[lat, lon, count, count per
+    label]`` and lat/lon are the mean position of the cell's points. The
+    level after the last zoom has one row per distinct location.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    codes = np.asarray(codes, dtype=np.int64)
+    levels = {}
+    for zoom in zooms:
+        x, y = _mercator_pixels(lat, lon, zoom)
+        cell = (np.floor(x / CELL_PIXELS).astype(np.int64) << 32) | np.floor(y / CELL_PIXELS).astype(np.int64)
+        levels[zoom] = _aggregate(cell, lat, lon, codes, n_labels)
+    location = np.unique(np.column_stack([lat, lon]), axis=0, return_inverse=True)[1].ravel()
+    levels[max(zooms) + 1] = _aggregate(location, lat, lon, codes, n_labels)
+    return levels
+
+
+_RENDERER = """
+(function () {
+    var map = %(map)s;
+    var caption = %(caption)s;
+    var labels = %(labels)s;
+    var colors = %(colors)s;
+    var levels = %(levels)s;
+    var zooms = Object.keys(levels).map(Number).sort(function (a, b) { return a - b; });
+    var layer = L.layerGroup().addTo(map);
+
+    function levelAt(zoom) {
+        var level = zooms[0];
+        zooms.forEach(function (z) { if (z <= zoom) { level = z; } });
+        return level;
+    }
+
+    function draw() {
+        layer.clearLayers();
+        var zoom = map.getZoom();
+        var bounds = map.getBounds().pad(0.25);
+        var rows = levels[levelAt(zoom)];
+        for (var i = 0; i < rows.length; i++) {
+            var row = rows[i];
+            if (!bounds.contains([row[0], row[1]])) { continue; }
+            var counts = row.slice(3), top = 0;
+            for (var k = 1; k < counts.length; k++) { if (counts[k] > counts[top]) { top = k; } }
+            var lines = [caption + ": " + labels[top]];
+            if (row[2] > 1) {
+                lines.unshift(row[2] + " entries");
+                counts.forEach(function (c, k) { if (c) { lines.push(labels[k] + ": " + c); } });
+            }
+            var marker = L.circleMarker([row[0], row[1]], {
+                radius: 5 + Math.min(15, 3 * Math.log2(row[2])),
+                color: colors[top], fillColor: colors[top], fillOpacity: 0.6, weight: 3
+            }).bindTooltip("<div>" + lines.join("<br>") + "</div>", {sticky: true});
+            if (zoom < zooms[zooms.length - 1] && row[2] > 1) {
+                marker.on("click", function (e) { map.setView(e.latlng, map.getZoom() + 2); });
+            }
+            layer.addLayer(marker);
+        }
+    }
+
+    map.on("zoomend moveend", draw);
+    draw();
+})();
+"""
+
+
+def add_clustered_markers(m, entries, colors, caption) -> None:
+    """Draw ``entries`` on the folium map ``m`` as server-side clustered markers.
+
+    ``entries`` has ``Latitude``, ``Longitude`` and ``label`` columns, and
+    ``colors`` maps every label to its marker color; other labels are left
+    out. A marker's color is its most common label, named in the tooltip
+    after ``caption``.
+    """
+    labels = list(colors)
+    entries = entries[entries["label"].isin(labels)]
+    codes = entries["label"].map({label: i for i, label in enumerate(labels)}).to_numpy()
+    levels = cluster_levels(entries["Latitude"], entries["Longitude"], codes, len(labels))
+    compact = {
+        zoom: [[round(r[0], 5), round(r[1], 5)] + [int(v) for v in r[2:]] for r in rows.tolist()]
+        for zoom, rows in levels.items()
+    }
+    m.get_root().script.add_child(folium.Element(_RENDERER % {
+        "map": m.get_name(),
+        "caption": json.dumps(caption),
+        "labels": json.dumps(labels),
+        "colors": json.dumps(list(colors.values())),
+        "levels": json.dumps(compact, separators=(",", ":")),
+    }))
+
+
+def render_emotion_map(direction) -> str:
+    """Full HTML document of the clustered negative emotion map of ``direction``."""
+    m = folium.Map(location=[39.5, -77.5], zoom_start=5, tiles='OpenStreetMap')
+    folium.GeoJson(
+        load_trail_states()[["name", "geometry"]],
+        style_function=lambda feature: {"color": "black", "fillColor": "green", "fillOpacity": 0.2, "weight": 2},
+    ).add_to(m)
+    add_clustered_markers(m, negative_emotion_entries(direction), NEGATIVE_EMOTIONS, "Most common emotion")
+    return m.get_root().render()
@@ -0,0 +1,58 @@
+"""Precomputed emotion aggregates for the Emotions Dashboard."""
+
+import pandas as pd
+
+
+def emotion_cube(datasets: dict) -> pd.DataFrame:
+    """Monthly emotion counts of every dataset in one table.
+
+    ``datasets`` maps a dataset name to a frame with ``date`` and ``label``
+    columns. The result is indexed by (dataset, year, month, label), where
+    ``month`` is the first day of the month, and has columns ``count``,
+    ``total`` (all emotions of that month), ``prop`` (count / total) and
+    ``dominant``, which marks the most frequent emotion of each month. Ties
+    go to the label that sorts first, as ``idxmax`` over the sorted counts
+    would pick.
+    """
+    frames = []
+    for name, df in datasets.items():
+        month = df["date"].dt.to_period("M").dt.to_timestamp().rename("month")
+        counts = df.groupby([month, "label"]).size().rename("count").reset_index()
+        counts.insert(0, "dataset", name)
+        frames.append(counts)
+    cube = pd.concat(frames, ignore_index=True)
+    cube.insert(1, "year", cube["month"].dt.year)
+    cube = cube.sort_values(["dataset", "year", "month", "label"], ignore_index=True)
+
+    per_month = cube.groupby(["dataset", "month"])["count"]
+    cube["total"] = per_month.transform("sum")
+    cube["prop"] = cube["count"] / cube["total"]
+    cube["dominant"] = False
+    cube.loc[per_month.idxmax(), "dominant"] = True
+    return cube.set_index(["dataset", "year", "month", "label"])
+
+
+def cube_slice(cube: pd.DataFrame, dataset, year) -> pd.DataFrame:
+    """Monthly rows of one dataset and year, with ``date`` and ``label`` columns."""
+    try:
+        rows = cube.loc[(dataset, int(year))]
+    except KeyError:
+        rows = cube.iloc[:0].droplevel(["dataset", "year"])
+    return rows.reset_index().rename(columns={"month": "date"})
+
+
+def daily_dominant(df: pd.DataFrame, order, hiker="hiker_anon") -> pd.DataFrame:
+    """Dominant emotion of every hiker and day.
+
+    The dominant emotion of a day is the label with the most entries that
+    day. Ties go to the label listed first in ``order``; labels missing from
+    ``order`` rank after it, alphabetically. Returns columns ``hiker``,
+    ``date``, ``label`` and ``count``, sorted by hiker and date.
+    """
+    counts = df.groupby([hiker, "date", "label"], observed=True).size().rename("count").reset_index()
+    rank = {label: i for i, label in enumerate(order)}
+    counts["rank"] = counts["label"].map(rank).fillna(len(rank))
+    counts = counts.sort_values([hiker, "date", "count", "rank", "label"],
+                                ascending=[True, True, False, True, True], kind="stable")
+    dominant = counts.drop_duplicates([hiker, "date"]).drop(columns="rank")
+    return dominant.rename(columns={hiker: "hiker"}).reset_index(drop=True)
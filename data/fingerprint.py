@@ -0,0 +1,21 @@
+"""Content fingerprints of source files."""
+
+import hashlib
+
+LFS_POINTER = b"version https://git-lfs.github.com/spec/"
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_lfs_pointer(path) -> bool:
+    """Whether ``path`` is a Git LFS pointer rather than the file's content."""
+    if path.stat().st_size > 1024:
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(LFS_POINTER)) == LFS_POINTER
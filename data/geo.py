@@ -0,0 +1,48 @@
+"""Appalachian Trail state geometry and point-in-state assignment."""
+
+from functools import lru_cache
+
+import geopandas as gpd
+import pandas as pd
+
+from .paths import TRAIL_STATES_GEOJSON
+
+TRAIL_STATES = [
+    "Georgia", "North Carolina", "Tennessee", "Virginia", "West Virginia",
+    "Maryland", "Pennsylvania", "New Jersey", "New York", "Connecticut",
+    "Massachusetts", "Vermont", "New Hampshire", "Maine",
+]
+
+TRAIL_MILES = {
+    "Georgia": 79, "North Carolina": 96, "Tennessee": 293, "Virginia": 554, "West Virginia": 4,
+    "Maryland": 41, "Pennsylvania": 229, "New Jersey": 72, "New York": 88, "Connecticut": 52,
+    "Massachusetts": 90, "Vermont": 150, "New Hampshire": 161, "Maine": 282,
+}
+
+
+@lru_cache(maxsize=1)
+def _trail_states() -> gpd.GeoDataFrame:
+    states = gpd.read_file(TRAIL_STATES_GEOJSON)
+    return states[states["name"].isin(TRAIL_STATES)].reset_index(drop=True)
+
+
+def load_trail_states() -> gpd.GeoDataFrame:
+    """Polygons of the 14 states the trail passes through.
+
+    Read from the copy bundled in ``data/assets`` (the 14 trail states of
+    PublicaMundi's us-states.json), so no network access is needed.
+    """
+    return _trail_states().copy()
+
+
+def assign_states(latitude: pd.Series, longitude: pd.Series, states: gpd.GeoDataFrame) -> pd.Series:
+    """Name of the trail state containing each point, NaN outside the trail states."""
+    points = gpd.GeoDataFrame(
+        index=latitude.index,
+        geometry=gpd.points_from_xy(longitude, latitude),
+        crs="EPSG:4326",
+    )
+    joined = gpd.sjoin(points, states[["name", "geometry"]], how="left", predicate="within")
+    # A point on a shared border matches both states; keep the first match
+    joined = joined[~joined.index.duplicated(keep="first")]
+    return joined["name"].reindex(latitude.index)
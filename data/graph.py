@@ -0,0 +1,121 @@
+"""Integer-indexed hiker relation graphs.
+
+Hiker names are interned once into int32 ids (``HikerIndex``), and every
+year's mention graph is held as a symmetric SciPy CSR adjacency matrix over
+those ids (``HikerGraph``) instead of a string-keyed ``networkx.Graph``.
+Degrees, edge lists and anonymized labels come straight from the arrays;
+``HikerGraph.to_networkx`` builds a networkx graph only where a library
+needs one.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class HikerIndex:
+    """Interning table of hiker names to int32 ids."""
+
+    def __init__(self, names=()):
+        self._index = pd.Index(pd.unique(pd.Series(list(names), dtype=object)))
+
+    def __len__(self):
+        return len(self._index)
+
+    def add(self, names) -> None:
+        names = pd.unique(pd.Series(np.asarray(names, dtype=object)).dropna())
+        new = names[self._index.get_indexer(names) < 0]
+        if len(new):
+            self._index = self._index.append(pd.Index(new))
+
+    def ids(self, names, add=True) -> np.ndarray:
+        """Ids of ``names``; unknown names are added unless ``add`` is false.
+
+        Missing names, and unknown ones when not adding, map to -1.
+        """
+        names = np.asarray(names, dtype=object)
+        if add:
+            self.add(names)
+        return self._index.get_indexer(names).astype(np.int32)
+
+    def names(self, ids) -> np.ndarray:
+        return self._index.to_numpy()[np.asarray(ids)]
+
+
+class HikerGraph:
+    """Undirected mention graph of one year over interned hiker ids.
+
+    ``nodes`` holds the hikers' ids in order of first appearance, and
+    ``adjacency`` is a symmetric 0/1 CSR matrix over positions in ``nodes``.
+    Hikers are anonymized as ``Hiker <position + 1>``.
+    """
+
+    def __init__(self, nodes, adjacency, index):
+        self.nodes = nodes
+        self.adjacency = adjacency
+        self.index = index
+
+    @classmethod
+    def from_edges(cls, src, dst, index=None):
+        """Graph of the mentions ``src -> dst`` given as name arrays.
+
+        A missing ``dst`` keeps ``src`` as a node without edges.
+        """
+        index = index if index is not None else HikerIndex()
+        src = index.ids(src)
+        dst = index.ids(dst)
+
+        # Node order follows the mention list: each hiker, then who they mention
+        order = np.column_stack([src, dst]).ravel()
+        nodes = pd.unique(order[order >= 0]).astype(np.int32)
+        position = pd.Index(nodes)
+        has_edge = dst >= 0
+        row = position.get_indexer(src[has_edge])
+        col = position.get_indexer(dst[has_edge])
+
+        n = len(nodes)
+        adjacency = sp.coo_matrix(
+            (np.ones(2 * len(row), dtype=np.int8), (np.r_[row, col], np.r_[col, row])),
+            shape=(n, n),
+        ).tocsr()
+        # Repeated mentions and self-mentions collapse into one edge
+        adjacency.data[:] = 1
+        return cls(nodes, adjacency, index)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return sp.triu(self.adjacency).nnz
+
+    @property
+    def labels(self) -> np.ndarray:
+        return np.array([f"Hiker {i + 1}" for i in range(self.num_nodes)], dtype=object)
+
+    @property
+    def names(self) -> np.ndarray:
+        return self.index.names(self.nodes)
+
+    def degrees(self) -> np.ndarray:
+        """Degree of every node; a self-mention counts twice, as in networkx."""
+        return np.asarray(self.adjacency.sum(axis=1)).ravel() + self.adjacency.diagonal()
+
+    def edges(self) -> np.ndarray:
+        """(k, 2) array of node positions, one row per undirected edge."""
+        upper = sp.triu(self.adjacency).tocoo()
+        return np.column_stack([upper.row, upper.col])
+
+    def positions(self, names) -> np.ndarray:
+        """Positions in ``nodes`` of hikers given by name; -1 when absent."""
+        ids = self.index.ids(names, add=False)
+        return np.where(ids >= 0, pd.Index(self.nodes).get_indexer(ids), -1)
+
+    def to_networkx(self) -> nx.Graph:
+        """networkx view with node positions as node keys."""
+        G = nx.Graph()
+        G.add_nodes_from(range(self.num_nodes))
+        G.add_edges_from(self.edges().tolist())
+        return G
@@ -0,0 +1,213 @@
+"""Movement of hiker communities animated in the browser.
+
+The rendered animations (``data.animations``) are videos of a few hundred KB
+per group that have to be drawn before they can be shown. ``group_payload``
+sends the browser the daily positions themselves instead: every member's
+track on the shared daily grid (``data.trajectories``), quantized to
+``1 / SCALE`` degrees and delta-encoded, which makes a group a few KB of
+small integers. ``player_html`` wraps the payload in a Plotly page that
+decodes it, computes the group centers and animates any number of groups on
+one map, with a slider to scrub through the days.
+"""
+
+import json
+
+import numpy as np
+from plotly.offline import get_plotlyjs_version
+
+from .access import JOURNAL, frame
+from .trajectories import Trajectories
+
+# Positions are sent in units of 1 / SCALE degrees, about 1 km
+SCALE = 100
+FPS = 12
+
+
+def _encode(values, starts) -> list:
+    """Deltas of ``values``, restarting from the absolute value at every start."""
+    deltas = np.diff(values, prepend=0)
+    deltas[starts] = values[starts]
+    return deltas.tolist()
+
+
+def decode_group(group, days, scale=SCALE) -> np.ndarray:
+    """Positions of the members of an encoded ``group``, as the player decodes them.
+
+    Returns an array of shape (hikers, ``days``, 2) of latitude and
+    longitude in degrees, NaN outside each member's span.
+    """
+    tracks = np.full((len(group["spans"]), days, 2), np.nan)
+    k = 0
+    for row, (first, length) in enumerate(group["spans"]):
+        for axis, deltas in enumerate((group["lat"], group["lon"])):
+            tracks[row, first:first + length, axis] = np.cumsum(deltas[k:k + length]) / scale
+        k += length
+    return tracks
+
+
+def group_payload(communities, year, groups) -> dict:
+    """Compact daily positions of the members of ``groups`` in ``year``.
+
+    Returns ``start`` (the first grid day), ``days``, ``scale`` and, per
+    group with a dated journal position, ``id``, the member ``names``,
+    ``spans`` (first grid day and number of days of every member, who has a
+    position on each day in between) and the flat ``lat``/``lon`` arrays of
+    the members' quantized positions, each member's first value absolute and
+    the others the change from the day before.
+    """
+    partition = communities["years"][str(year)]["partition"]
+    groups = list(groups)
+    members = {hiker: cid for hiker, cid in partition.items() if cid in groups}
+    df = frame(JOURNAL, columns=["normalized_name", "date", "Latitude", "Longitude"], years=[year])
+    df = df.astype({"normalized_name": str})
+    trajectories = Trajectories.from_entries(df[df["normalized_name"].isin(list(members))])
+
+    dates = trajectories.dates
+    payload = {
+        "start": f"{dates[0]:%Y-%m-%d}" if len(dates) else None,
+        "days": len(dates),
+        "scale": SCALE,
+        "groups": [],
+    }
+    if trajectories.positions.size == 0:
+        return payload
+
+    hikers, active = trajectories.hikers, trajectories.active
+    quantized = np.round(np.nan_to_num(trajectories.positions) * SCALE).astype(np.int64)
+    first = active.argmax(axis=1)
+    length = active.sum(axis=1)
+    hiker_groups = np.array([members[hiker] for hiker in hikers], dtype=np.int64)
+
+    for group in groups:
+        rows = np.flatnonzero((hiker_groups == group) & (length > 0))
+        if not len(rows):
+            continue
+        values = quantized[rows][active[rows]]
+        starts = np.concatenate([[0], np.cumsum(length[rows])[:-1]])
+        payload["groups"].append({
+            "id": group,
+            "names": hikers[rows].tolist(),
+            "spans": np.column_stack([first[rows], length[rows]]).tolist(),
+            "lat": _encode(values[:, 0], starts),
+            "lon": _encode(values[:, 1], starts),
+        })
+    return payload
+
+
+_PLAYER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="https://cdn.plot.ly/plotly-%(plotly_version)s.min.js"></script>
+<style>html, body { margin: 0; } #player { width: 100vw; height: 100vh; }</style>
+</head>
+<body>
+<div id="player"></div>
+<script>
+(function () {
+    var payload = %(payload)s;
+    var colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                  "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"];
+    var start = Date.parse(payload.start + "T00:00:00Z");
+    var labels = [];
+    for (var d = 0; d < payload.days; d++) {
+        labels.push(new Date(start + d * 86400000).toLocaleDateString(
+            "en-US", {month: "short", day: "2-digit", year: "numeric", timeZone: "UTC"}));
+    }
+
+    // Undo the delta encoding: tracks[hiker][day] = [lat, lon] or null
+    function decode(group) {
+        var tracks = [], k = 0;
+        group.spans.forEach(function (span) {
+            var track = new Array(payload.days).fill(null), lat = 0, lon = 0;
+            for (var i = 0; i < span[1]; i++, k++) {
+                lat = i ? lat + group.lat[k] : group.lat[k];
+                lon = i ? lon + group.lon[k] : group.lon[k];
+                track[span[0] + i] = [lat / payload.scale, lon / payload.scale];
+            }
+            tracks.push(track);
+        });
+        return tracks;
+    }
+
+    var groups = payload.groups.map(function (group) {
+        return {id: group.id, names: group.names, tracks: decode(group)};
+    });
+
+    function traces(day) {
+        var data = [], counts = [];
+        groups.forEach(function (group, g) {
+            var lat = [], lon = [], text = [];
+            group.tracks.forEach(function (track, h) {
+                if (track[day]) { lat.push(track[day][0]); lon.push(track[day][1]); text.push(group.names[h]); }
+            });
+            var n = lat.length;
+            var center = n ? [lat.reduce(function (a, b) { return a + b; }, 0) / n,
+                              lon.reduce(function (a, b) { return a + b; }, 0) / n] : null;
+            var color = colors[g %% colors.length];
+            data.push({
+                type: "scattergeo", mode: "markers", lat: lat, lon: lon, text: text,
+                name: "Group " + group.id + " (" + group.tracks.length + " hikers)", legendgroup: String(group.id),
+                hovertemplate: "%%{text}<extra>Group " + group.id + "</extra>",
+                marker: {size: 7, color: color, opacity: 0.7}
+            });
+            data.push({
+                type: "scattergeo", mode: "markers", lat: center ? [center[0]] : [], lon: center ? [center[1]] : [],
+                name: "Group " + group.id + " center", legendgroup: String(group.id), showlegend: false,
+                hovertemplate: "Group " + group.id + " center<extra></extra>",
+                marker: {size: 16, color: color, symbol: "star", line: {width: 1, color: "black"}}
+            });
+            counts.push("Group " + group.id + ": " + n);
+        });
+        return {data: data, title: labels[day] + " (" + counts.join(", ") + " hikers)"};
+    }
+
+    var frames = [], steps = [];
+    for (var day = 0; day < payload.days; day++) {
+        var frame = traces(day);
+        frames.push({name: labels[day], data: frame.data, layout: {title: {text: frame.title}}});
+        steps.push({
+            label: labels[day], method: "animate",
+            args: [[labels[day]], {mode: "immediate", frame: {duration: 0, redraw: true}, transition: {duration: 0}}]
+        });
+    }
+    var first = payload.days ? frames[0] : {data: [], layout: {title: {text: "No positions"}}};
+
+    Plotly.newPlot("player", first.data, {
+        title: first.layout.title,
+        margin: {l: 0, r: 0, t: 40, b: 0},
+        legend: {x: 0.99, xanchor: "right", y: 0.02, yanchor: "bottom"},
+        geo: {
+            scope: "usa", resolution: 50, showsubunits: true, subunitcolor: "#6b7b6b",
+            showland: true, landcolor: "#e8f0e0",
+            lonaxis: {range: [-86, -66]}, lataxis: {range: [33, 47]}
+        },
+        updatemenus: [{
+            type: "buttons", direction: "left", x: 0, y: 0, xanchor: "left", yanchor: "top", pad: {t: 40, r: 10},
+            buttons: [
+                {label: "Play", method: "animate", args: [null, {
+                    mode: "immediate", fromcurrent: true,
+                    frame: {duration: %(frame_ms)d, redraw: true}, transition: {duration: 0}}]},
+                {label: "Pause", method: "animate", args: [[null], {
+                    mode: "immediate", frame: {duration: 0, redraw: true}, transition: {duration: 0}}]}
+            ]
+        }],
+        sliders: [{
+            x: 0.12, len: 0.88, y: 0, yanchor: "top", pad: {t: 30},
+            currentvalue: {visible: false}, steps: steps
+        }]
+    }, {responsive: true}).then(function () { Plotly.addFrames("player", frames); });
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def player_html(payload) -> str:
+    """Full HTML document animating the groups of ``group_payload``."""
+    return _PLAYER % {
+        "plotly_version": get_plotlyjs_version(),
+        "payload": json.dumps(payload, separators=(",", ":")),
+        "frame_ms": round(1000 / FPS),
+    }
@@ -0,0 +1,58 @@
+"""Multi-label social interactions of the journal entries.
+
+``Unique Interactions`` holds the stringified Python list of the interactions
+mentioned in an entry (``"['trail magic', 'friend']"``). It is parsed once at
+ingest into an exploded table with one row per (entry, interaction), keyed by
+the entry's ``row_id``, so interaction filters become vectorized masks instead
+of text scans.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import access
+
+TRAIL_MAGIC = "trail magic"
+
+# Keyword groups of the socialness analysis on the Socialness page
+SOCIALNESS_GROUPS = {
+    "Group 1": ["campfire", "conversation", "share", "meet", "call", "together"],
+    "Group 2": ["couple", "family", "friend", "pet"],
+    "Group 3": ["magic", "trail magic", "trail angel"],
+    "Group 4": ["fest", "festival", "event", "community", "trail town"],
+}
+
+# Elements of a Python list repr are single-quoted unless they contain a quote
+_ELEMENT = r"""'(?P<single>[^']*)'|"(?P<double>[^"]*)\""""
+
+
+def parse_interactions(values: pd.Series) -> pd.DataFrame:
+    """Explode stringified interaction lists into (row_id, interaction) rows.
+
+    ``values`` is indexed by row id. Labels are stripped and lowercased.
+    """
+    matches = values.dropna().astype(str).str.extractall(_ELEMENT)
+    interaction = matches["single"].fillna(matches["double"]).str.strip().str.lower()
+    exploded = pd.DataFrame({
+        "row_id": interaction.index.get_level_values(0).astype("int64"),
+        "interaction": interaction.to_numpy(),
+    })
+    exploded = exploded[exploded["interaction"] != ""]
+    # An entry lists each interaction once, but guard against repeated labels
+    return exploded.drop_duplicates(ignore_index=True)
+
+
+def interaction_rows(kinds, years=None) -> np.ndarray:
+    """Row ids of the journal entries mentioning any of ``kinds``."""
+    t = access.table(access.INTERACTIONS)
+    mask = pc.is_in(t["interaction"], value_set=pa.array(list(kinds), pa.string()))
+    if years is not None:
+        mask = pc.and_(mask, pc.is_in(t["year"], value_set=pa.array([int(y) for y in years], t["year"].type)))
+    return np.unique(t.filter(mask)["row_id"].to_numpy())
+
+
+def interaction_mask(row_ids: pd.Series, kinds, years=None) -> pd.Series:
+    """Boolean mask over journal rows that mention any of ``kinds``."""
+    return row_ids.isin(interaction_rows(kinds, years))
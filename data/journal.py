@@ -0,0 +1,190 @@
+"""Columnar store for the journal entries CSV.
+
+The raw ``CLEANED_CS6724_data_2013_2023.csv`` is ~700 MB and was parsed in full
+on every Streamlit rerun. ``ingest_journal`` converts it once into a Parquet
+dataset partitioned by ``year`` with typed columns; pages read it through the
+shared Arrow tables of ``data.access`` (``frame(JOURNAL, columns, years)``).
+
+The store holds two datasets: ``entries`` (one row per journal entry, keyed by
+``row_id``) and ``interactions`` (the parsed ``Unique Interactions`` lists,
+one row per entry and interaction).
+"""
+
+import json
+import shutil
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from filelock import FileLock
+
+from .geo import assign_states, load_trail_states
+from .interactions import parse_interactions
+from .paths import JOURNAL_CSV, JOURNAL_DIR
+
+# Bump whenever the stored schema or the derived columns change
+STORE_VERSION = 2
+
+MANIFEST_NAME = "_manifest.json"
+ENTRIES = "entries"
+INTERACTIONS = "interactions"
+CHUNK_ROWS = 50_000
+# The CSV is decoded as UTF-8 if it all is, else as Latin-1, the encoding the
+# pages originally read it with; Latin-1 decodes any byte, so nothing is replaced
+ENCODINGS = ("utf-8", "latin-1")
+
+NUMERIC_COLUMNS = ["Latitude", "Longitude"]
+CATEGORICAL_COLUMNS = ["Hiker trail name", "normalized_name", "Destination", "State", "label"]
+
+_ingest_lock = threading.Lock()
+_file_locks = {}  # store dir -> FileLock
+
+
+def _store_lock(store_dir) -> FileLock:
+    """Lock on ``store_dir`` shared with other processes (``python -m data ingest``, other servers)."""
+    key = str(store_dir)
+    if key not in _file_locks:
+        store_dir.parent.mkdir(parents=True, exist_ok=True)
+        _file_locks[key] = FileLock(store_dir.with_name(store_dir.name + ".lock"))
+    return _file_locks[key]
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Lowercase trail names stripped to letters, as used in the relation files."""
+    return names.astype(str).str.strip().str.lower().str.replace(r"[^a-z]", "", regex=True)
+
+
+def _source_signature(path) -> dict:
+    stat = path.stat()
+    return {"version": STORE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_manifest(store_dir) -> dict | None:
+    try:
+        with open(store_dir / MANIFEST_NAME) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def journal_store_is_current(csv_path=JOURNAL_CSV, store_dir=JOURNAL_DIR) -> bool:
+    manifest = _read_manifest(store_dir)
+    return manifest is not None and manifest.get("source") == _source_signature(csv_path)
+
+
+def _prepare_chunk(chunk: pd.DataFrame, states) -> pd.DataFrame:
+    chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce")
+    for col in NUMERIC_COLUMNS:
+        chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+
+    year = pd.to_numeric(chunk["year"], errors="coerce") if "year" in chunk else pd.Series(index=chunk.index, dtype=float)
+    year = year.fillna(chunk["date"].dt.year)
+    chunk = chunk[year.notna()].copy()
+    chunk["year"] = year[year.notna()].astype("int16")
+    # The reader keeps numbering rows across chunks, which gives a stable entry key
+    chunk.insert(0, "row_id", chunk.index.astype("int64"))
+
+    chunk["normalized_name"] = normalize_names(chunk["Hiker trail name"])
+
+    chunk["State"] = pd.Series(pd.NA, index=chunk.index, dtype=object)
+    located = chunk[["Latitude", "Longitude"]].notna().all(axis=1)
+    if located.any():
+        chunk.loc[located, "State"] = assign_states(
+            chunk.loc[located, "Latitude"], chunk.loc[located, "Longitude"], states
+        )
+    return chunk
+
+
+def _to_table(chunk: pd.DataFrame) -> pa.Table:
+    """Arrow table with a fixed schema, identical for every chunk of the CSV."""
+    types = {"row_id": pa.int64(), "date": pa.timestamp("ns"), "year": pa.int16()}
+    types.update({col: pa.float64() for col in NUMERIC_COLUMNS})
+    schema = pa.schema([(col, types.get(col, pa.string())) for col in chunk.columns])
+    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+    for col in CATEGORICAL_COLUMNS:
+        if col in table.column_names:
+            i = table.column_names.index(col)
+            table = table.set_column(i, col, pc.dictionary_encode(table[col]))
+    return table
+
+
+def _interactions_table(chunk: pd.DataFrame) -> pa.Table:
+    exploded = parse_interactions(chunk["Unique Interactions"])
+    exploded["year"] = exploded["row_id"].map(chunk.set_index("row_id")["year"])
+    table = pa.Table.from_pandas(exploded, schema=pa.schema([
+        ("row_id", pa.int64()), ("interaction", pa.string()), ("year", pa.int16()),
+    ]), preserve_index=False)
+    return table.set_column(1, "interaction", pc.dictionary_encode(table["interaction"]))
+
+
+def _write_chunks(csv_path, tmp_dir, chunk_rows, encoding) -> int:
+    states = load_trail_states()
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    rows = 0
+    # Everything is read as text first so every chunk ends up with the same schema
+    reader = pd.read_csv(csv_path, dtype=str, chunksize=chunk_rows, encoding=encoding)
+    for i, chunk in enumerate(reader):
+        chunk = _prepare_chunk(chunk, states)
+        pq.write_to_dataset(_to_table(chunk), tmp_dir / ENTRIES, partition_cols=["year"],
+                            basename_template=f"part-{i:05d}-{{i}}.parquet")
+        if "Unique Interactions" in chunk:
+            pq.write_to_dataset(_interactions_table(chunk), tmp_dir / INTERACTIONS, partition_cols=["year"],
+                                basename_template=f"part-{i:05d}-{{i}}.parquet")
+        rows += len(chunk)
+    return rows
+
+
+def ingest_journal(csv_path=JOURNAL_CSV, store_dir=JOURNAL_DIR, chunk_rows=CHUNK_ROWS) -> int:
+    """Convert the journal CSV into a year-partitioned Parquet dataset.
+
+    Returns the number of rows written. The dataset is written next to the
+    final location and swapped in at the end so readers never see a partial
+    store, and removed if the ingest fails; a file lock keeps other processes
+    from ingesting at the same time.
+    """
+    tmp_dir = store_dir.with_name(store_dir.name + ".tmp")
+    with _store_lock(store_dir):
+        try:
+            for encoding in ENCODINGS:
+                try:
+                    rows = _write_chunks(csv_path, tmp_dir, chunk_rows, encoding)
+                    break
+                except UnicodeDecodeError:
+                    continue
+
+            with open(tmp_dir / MANIFEST_NAME, "w") as f:
+                json.dump({"source": _source_signature(csv_path), "rows": rows, "encoding": encoding}, f)
+
+            shutil.rmtree(store_dir, ignore_errors=True)
+            tmp_dir.rename(store_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return rows
+
+
+def ensure_journal_store(csv_path=JOURNAL_CSV, store_dir=JOURNAL_DIR) -> int | None:
+    """Run the one-time ingest if the store is missing or older than the CSV.
+
+    Returns the number of rows ingested, or None if the store was current.
+    """
+    # Concurrent sessions and processes wait for a single ingest instead of each starting one
+    with _ingest_lock, _store_lock(store_dir):
+        if not journal_store_is_current(csv_path, store_dir):
+            return ingest_journal(csv_path, store_dir)
+    return None
+
+
+def journal_years(csv_path=JOURNAL_CSV, store_dir=JOURNAL_DIR, name=ENTRIES) -> list:
+    """Years of the partitions of the ``entries`` or ``interactions`` dataset."""
+    ensure_journal_store(csv_path, store_dir)
+    return sorted(int(path.name.split("=", 1)[1]) for path in (store_dir / name).glob("year=*"))
+
+
+def journal_dataset(csv_path=JOURNAL_CSV, store_dir=JOURNAL_DIR, name=ENTRIES) -> ds.Dataset:
+    """The ``entries`` or ``interactions`` dataset of the store."""
+    ensure_journal_store(csv_path, store_dir)
+    return ds.dataset(store_dir / name, format="parquet", partitioning="hive")
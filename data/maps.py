@@ -0,0 +1,231 @@
+"""Renderers of the maps and charts shown as pre-built HTML documents.
+
+These used to be hand-made HTML files with no code behind them. Each
+``render_*`` function rebuilds one of them from the canonical inputs (the
+journal store, the spots CSVs and the bundled state polygons) and returns
+the full document; ``data.build`` runs them and caches the results.
+"""
+
+import calendar
+
+import folium
+import pandas as pd
+import plotly.express as px
+from folium.plugins import HeatMap
+
+from .access import INTERACTIONS, JOURNAL, frame
+from .emotion_maps import add_clustered_markers
+from .geo import load_trail_states
+from .interactions import SOCIALNESS_GROUPS, TRAIL_MAGIC, interaction_rows
+from .paths import BEST_SPOTS_CSV, WORST_SPOTS_CSV
+from .trail_magic import trail_magic_per_mile
+
+# Bump whenever a rendered map or chart changes without a change to this file
+MAPS_VERSION = 1
+TRAIL_CENTER = [39.5, -77.5]
+# Years covered by the hiker density map and by the socialness charts
+DENSITY_YEARS = range(2021, 2024)
+SOCIALNESS_YEARS = range(2020, 2024)
+# Sentiment of every emotion label and its marker color, as in the page 3 legend
+SENTIMENTS = {
+    "joy": "Positive", "love": "Positive", "surprise": "Positive",
+    "neutral": "Neutral",
+    "anger": "Negative", "disgust": "Negative", "fear": "Negative", "sadness": "Negative",
+}
+SENTIMENT_COLORS = {"Positive": "green", "Negative": "red", "Neutral": "blue"}
+HEAT_GRADIENT = {"0.2": "blue", "0.4": "lime", "0.6": "orange", "1": "red"}
+# Colors of the first, second and third trail magic location of a state
+RANK_COLORS = ["darkred", "red", "lightred"]
+# Heat map points are merged on a grid of this many decimal degrees
+HEAT_DECIMALS = 3
+
+
+def _base_map(location=TRAIL_CENTER, zoom_start=5) -> folium.Map:
+    return folium.Map(location=location, zoom_start=zoom_start, tiles='OpenStreetMap')
+
+
+def _add_title(m, title) -> None:
+    m.get_root().html.add_child(folium.Element(
+        f"<h3 align='center' style='font-size:20px; margin-top:6px;'>{title}</h3>"
+    ))
+
+
+def _add_state_outlines(m) -> None:
+    folium.GeoJson(
+        load_trail_states()[["name", "geometry"]],
+        style_function=lambda feature: {"color": "black", "fillColor": "green", "fillOpacity": 0.2, "weight": 2},
+    ).add_to(m)
+
+
+def _heat_points(lat, lon, weight=None) -> list:
+    """[lat, lon, weight] rows with the weights of nearby points summed."""
+    points = pd.DataFrame({
+        "lat": pd.Series(lat).round(HEAT_DECIMALS).to_numpy(),
+        "lon": pd.Series(lon).round(HEAT_DECIMALS).to_numpy(),
+        "weight": 1.0 if weight is None else pd.Series(weight).to_numpy(),
+    }).dropna()
+    points = points.groupby(["lat", "lon"], sort=False)["weight"].sum().reset_index()
+    return points.to_numpy().tolist()
+
+
+def render_spots_map() -> str:
+    """Most (blue) and least (red) enjoyable spots of every state."""
+    m = _base_map(location=[0, 0], zoom_start=1)
+    for path, color in [(BEST_SPOTS_CSV, "blue"), (WORST_SPOTS_CSV, "red")]:
+        spots = pd.read_csv(path, usecols=["Destination", "Latitude", "Longitude"]).dropna()
+        for spot in spots.itertuples(index=False):
+            folium.Marker(
+                [spot.Latitude, spot.Longitude],
+                popup=f"{spot.Destination}<br>Coordinate: ({spot.Latitude}, {spot.Longitude})",
+                icon=folium.Icon(color=color, icon="info-sign"),
+            ).add_to(m)
+    _add_state_outlines(m)
+    west, south, east, north = load_trail_states().total_bounds
+    m.fit_bounds([[south, west], [north, east]])
+    return m.get_root().render()
+
+
+def render_trail_magic_map() -> str:
+    """Choropleth of the trail magic entries of every state over all years."""
+    states = load_trail_states()
+    states = states.merge(trail_magic_per_mile(), left_on='name', right_on='State', how='left')
+    states["Trail Magic Count"] = states["Trail Magic Count"].fillna(0)
+
+    m = _base_map()
+    folium.Choropleth(
+        geo_data=states.to_json(),
+        name="Trail Magic Count",
+        data=states,
+        columns=["name", "Trail Magic Count"],
+        key_on="feature.properties.name",
+        fill_color="YlGnBu",
+        fill_opacity=0.7,
+        line_opacity=0.5,
+        legend_name="Number of Trail Magic Events",
+        highlight=True
+    ).add_to(m)
+
+    folium.GeoJson(
+        states[["name", "Trail Magic Count", "geometry"]],
+        tooltip=folium.GeoJsonTooltip(
+            fields=["name", "Trail Magic Count"],
+            aliases=["State: ", "Trail Magic Count: "],
+            localize=True
+        )
+    ).add_to(m)
+    _add_title(m, "Trail Magic Occurences by State")
+    return m.get_root().render()
+
+
+def top_trail_magic_locations(per_state=3) -> pd.DataFrame:
+    """The destinations with the most trail magic entries in every state.
+
+    Returns ``State``, ``Destination``, ``Trail Magic Count``, ``rank``
+    (from 0) and the median ``Latitude``/``Longitude`` of the entries.
+    """
+    df = frame(JOURNAL, columns=["row_id", "State", "Destination", "Latitude", "Longitude"])
+    df = df[df["row_id"].isin(interaction_rows([TRAIL_MAGIC]))]
+    df = df.dropna(subset=["State", "Destination", "Latitude", "Longitude"])
+    locations = df.groupby(["State", "Destination"], observed=True).agg(
+        **{"Trail Magic Count": ("row_id", "size"), "Latitude": ("Latitude", "median"), "Longitude": ("Longitude", "median")}
+    ).reset_index()
+    locations = locations.sort_values(["State", "Trail Magic Count", "Destination"],
+                                      ascending=[True, False, True], kind="stable")
+    locations["rank"] = locations.groupby("State", observed=True).cumcount()
+    return locations[locations["rank"] < per_state].reset_index(drop=True)
+
+
+def render_top_trail_magic_map() -> str:
+    """Markers on the top trail magic locations of every state."""
+    m = _base_map(zoom_start=6)
+    for spot in top_trail_magic_locations(len(RANK_COLORS)).itertuples(index=False):
+        folium.Marker(
+            [spot.Latitude, spot.Longitude],
+            popup=f"Destination: {spot.Destination}<br>Lat: {spot.Latitude}, Lon: {spot.Longitude}",
+            icon=folium.Icon(color=RANK_COLORS[spot.rank], icon="info-sign"),
+        ).add_to(m)
+    _add_state_outlines(m)
+    _add_title(m, "Top Trail Magic Locations in Each State")
+    return m.get_root().render()
+
+
+def render_hiker_density_map() -> str:
+    """Heat map of the journal entries with markers colored by sentiment."""
+    df = frame(JOURNAL, columns=["Latitude", "Longitude", "label"], years=DENSITY_YEARS)
+    df = df.dropna(subset=["Latitude", "Longitude"])
+    m = _base_map()
+    HeatMap(_heat_points(df["Latitude"], df["Longitude"]), radius=12, gradient=HEAT_GRADIENT).add_to(m)
+    sentiments = df[["Latitude", "Longitude"]].assign(label=df["label"].astype(str).map(SENTIMENTS))
+    add_clustered_markers(m, sentiments, SENTIMENT_COLORS, "Most common sentiment")
+    return m.get_root().render()
+
+
+def socialness_interactions(years=SOCIALNESS_YEARS) -> pd.DataFrame:
+    """One row per journal entry and socialness keyword it mentions.
+
+    Columns are ``row_id``, ``interaction``, ``group``, ``date``,
+    ``Latitude`` and ``Longitude``.
+    """
+    groups = {keyword: group for group, keywords in SOCIALNESS_GROUPS.items() for keyword in keywords}
+    rows = frame(INTERACTIONS, columns=["row_id", "interaction"], years=years)
+    rows = rows[rows["interaction"].isin(list(groups))]
+    rows = rows.assign(group=rows["interaction"].map(groups))
+    entries = frame(JOURNAL, columns=["row_id", "date", "Latitude", "Longitude"], years=years)
+    return rows.merge(entries, on="row_id")
+
+
+def render_social_density_map() -> str:
+    """Heat maps of the socialness groups, one toggleable layer per group.
+
+    On the combined layer an entry weighs as many socialness groups as it
+    mentions.
+    """
+    rows = socialness_interactions().dropna(subset=["Latitude", "Longitude"])
+    per_group = rows.drop_duplicates(["row_id", "group"])
+    m = _base_map()
+    weights = per_group.groupby("row_id").agg(Latitude=("Latitude", "first"), Longitude=("Longitude", "first"),
+                                              weight=("group", "size"))
+    layer = folium.FeatureGroup(name="All groups")
+    HeatMap(_heat_points(weights["Latitude"], weights["Longitude"], weights["weight"]), radius=12).add_to(layer)
+    layer.add_to(m)
+    for group, keywords in SOCIALNESS_GROUPS.items():
+        points = per_group[per_group["group"] == group]
+        layer = folium.FeatureGroup(name=f"{group}: {', '.join(keywords)}", show=False)
+        HeatMap(_heat_points(points["Latitude"], points["Longitude"]), radius=12).add_to(layer)
+        layer.add_to(m)
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m.get_root().render()
+
+
+def _monthly_socialness() -> pd.DataFrame:
+    rows = socialness_interactions().dropna(subset=["date"])
+    rows["year"] = rows["date"].dt.year
+    rows["month"] = rows["date"].dt.month
+    return rows
+
+
+def render_socialness_bar_chart() -> str:
+    """Socialness interactions per year, stacked by month."""
+    counts = _monthly_socialness().groupby(["year", "month"], observed=True).size().reset_index(name="Interactions")
+    counts["Month"] = counts["month"].map(dict(enumerate(calendar.month_name)))
+    fig = px.bar(
+        counts, x="year", y="Interactions", color="Month",
+        category_orders={"Month": calendar.month_name[1:]},
+        title="Total Unique Social Interactions by Year and Month",
+        labels={"year": "Year", "Interactions": "Unique Interactions"},
+    )
+    fig.update_xaxes(type="category")
+    return fig.to_html(include_plotlyjs="cdn")
+
+
+def render_socialness_line_chart() -> str:
+    """Socialness interactions per month, one line per interaction type."""
+    counts = _monthly_socialness().groupby(["interaction", "month"], observed=True).size().reset_index(name="Interactions")
+    counts = counts.sort_values(["interaction", "month"])
+    fig = px.line(
+        counts, x="month", y="Interactions", color="interaction", markers=True,
+        title="Monthly Distribution of Unique Social Interactions",
+        labels={"month": "Month", "Interactions": "Unique Interactions", "interaction": "Interaction"},
+    )
+    fig.update_xaxes(tickmode="array", tickvals=list(range(1, 13)), ticktext=calendar.month_abbr[1:])
+    return fig.to_html(include_plotlyjs="cdn")
@@ -0,0 +1,38 @@
+"""Locations of the raw inputs and of the derived data store."""
+
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Folder of the raw inputs and of the data store: the repository, unless
+# TRAIL_DATA_DIR points at another copy, such as one made by ``python -m data synth``
+DATA_DIR = Path(os.environ.get("TRAIL_DATA_DIR", ROOT)).resolve()
+
+# Raw inputs shipped with the repository
+JOURNAL_CSV = DATA_DIR / "CLEANED_CS6724_data_2013_2023.csv"
+RELATIONS_JSON = DATA_DIR / "cleaned_yearly_hiker_relations.json"
+RELATIONS_CSV = DATA_DIR / "cleaned_yearly_hiker_relations.csv"
+EMOTIONS_XLSX = DATA_DIR / "Emotions Visualization Chart.xlsx"
+TOP_10_EXTRACTION_XLSX = DATA_DIR / "Top Ten Percent Data Extraction.xlsx"
+TOP_10_XLSX = DATA_DIR / "2025-03-25_Top10Pct.xlsx"
+TOP_10_SHEET = "Top_10pct_Miles_2021-23"
+BEST_SPOTS_CSV = DATA_DIR / "best spots.csv"
+WORST_SPOTS_CSV = DATA_DIR / "worst spots.csv"
+
+# Static assets bundled with the data package
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+TRAIL_STATES_GEOJSON = ASSETS_DIR / "trail_states.geojson"
+
+# Streamlit static folder (served under app/static/ with enableStaticServing)
+APP_STATIC_DIR = ROOT / "static"
+STATIC_MAPS_DIR = APP_STATIC_DIR / "maps"
+
+# Derived artifacts (rebuilt on demand, never committed)
+STORE_DIR = DATA_DIR / "data_store"
+JOURNAL_DIR = STORE_DIR / "journal"
+ARROW_DIR = STORE_DIR / "arrow"
+COMMUNITIES_DIR = STORE_DIR / "communities"
+TRAIL_MAGIC_COUNTS = STORE_DIR / "trail_magic_counts.parquet"
+MAPS_DIR = STORE_DIR / "maps"
+ANIMATIONS_DIR = STORE_DIR / "animations"
+WORKBOOKS_DIR = STORE_DIR / "workbooks"
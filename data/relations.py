@@ -0,0 +1,72 @@
+"""Hiker mention relations as one tidy edge table.
+
+The relations exist in two shapes: ``cleaned_yearly_hiker_relations.csv``
+(one row per hiker and year, mentions comma-separated) and
+``cleaned_yearly_hiker_relations.json`` (year -> hiker -> mention list). Both
+parse into the same table with one row per (year, src, dst) mention, names
+stripped and lowercased. A hiker who mentions nobody keeps one row with a
+missing ``dst`` so it still appears as a node.
+
+The JSON file is the canonical source: it is the one the community artifact
+is built from, and the store's ``HIKER_RELATIONS`` table (parsed once and
+memory-mapped) feeds every graph of the Community Dynamics page.
+"""
+
+import json
+
+import pandas as pd
+
+from .graph import HikerGraph, HikerIndex
+
+COLUMNS = ["year", "src", "dst"]
+
+
+def _normalize(names: pd.Series) -> pd.Series:
+    names = names.str.strip().str.lower()
+    return names.mask(names == "")
+
+
+def _tidy(year, src, dst) -> pd.DataFrame:
+    edges = pd.DataFrame({"year": year, "src": _normalize(src), "dst": _normalize(dst)})
+    edges = edges.dropna(subset=["src"])
+    # A hiker with mentions does not also need its placeholder row
+    edges = edges.drop_duplicates(ignore_index=True)
+    placeholder = edges["dst"].isna() & edges.duplicated(["year", "src"], keep=False)
+    edges = edges[~placeholder].reset_index(drop=True)
+    edges["year"] = edges["year"].astype("int16")
+    return edges[COLUMNS]
+
+
+def read_relations_csv(path) -> pd.DataFrame:
+    """Edge table of the ``Year``/``Hiker``/``Mentioned Hikers`` CSV."""
+    df = pd.read_csv(path, usecols=["Year", "Hiker", "Mentioned Hikers"], dtype={"Hiker": str, "Mentioned Hikers": str})
+    mentions = df["Mentioned Hikers"].fillna("").str.split(",")
+    exploded = df.assign(dst=mentions).explode("dst", ignore_index=True)
+    return _tidy(exploded["Year"], exploded["Hiker"], exploded["dst"])
+
+
+def read_relations_json(path) -> pd.DataFrame:
+    """Edge table of the ``{year: {hiker: [mentions]}}`` JSON."""
+    with open(path) as f:
+        relations = json.load(f)
+    hikers = pd.DataFrame(
+        [(int(year), hiker, mentions or [None]) for year, by_hiker in relations.items()
+         for hiker, mentions in by_hiker.items()],
+        columns=["year", "src", "dst"],
+    ).explode("dst", ignore_index=True)
+    return _tidy(hikers["year"], hikers["src"], hikers["dst"].astype(object))
+
+
+def read_relations(path) -> pd.DataFrame:
+    if path.suffix == ".csv":
+        return read_relations_csv(path)
+    return read_relations_json(path)
+
+
+def year_graphs(edges: pd.DataFrame) -> dict:
+    """One ``HikerGraph`` per year of ``edges``, sharing a single ``HikerIndex``."""
+    index = HikerIndex()
+    return {
+        int(year): HikerGraph.from_edges(group["src"].to_numpy(), group["dst"].to_numpy(), index)
+        for year, group in edges.groupby("year", sort=True)
+    }
@@ -0,0 +1,98 @@
+"""Pre-rendered HTML maps served as static files instead of inlined.
+
+Pages used to read a map on every rerun and inline it with
+``components.html``, which resends the whole document (up to 2 MB) over the
+websocket on every rerun of every session. ``static_map_html`` publishes the
+file once per process, and again only when its mtime or size changes, into
+Streamlit's static folder and returns a small loader document that fetches
+it from ``app/static/maps/``. The server gzips the response, and the URL
+carries the content hash, so browsers cache the map until it changes.
+
+Streamlit serves ``.html`` static files as ``text/plain`` (it never renders
+them itself), so the loader writes the fetched text into its own frame.
+When static serving is disabled the map is inlined as before, from the same
+in-process cache.
+
+``show_map`` embeds a build artifact (``data.build``) this way, or tells the
+user why it cannot be shown.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from urllib.parse import quote
+
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit import config
+
+from .build import ArtifactUnavailable, map_path
+from .paths import ROOT, STATIC_MAPS_DIR
+
+_lock = threading.Lock()
+_published = {}  # source path -> (mtime_ns, size, url, html)
+
+_LOADER = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<script>
+fetch({url})
+  .then(function (r) {{ if (!r.ok) throw new Error(r.status); return r.text(); }})
+  .then(function (html) {{ document.open(); document.write(html); document.close(); }})
+  .catch(function (e) {{ document.body.textContent = "The map could not be loaded (" + e.message + ")."; }});
+</script>
+</body></html>"""
+
+
+def static_name(path) -> str:
+    """File name of ``path`` under ``static/maps``, safe to put in a URL."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", Path(path).name)
+
+
+def _write(target, content) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    tmp.write_bytes(content)
+    tmp.replace(target)
+
+
+def publish(path, name=None) -> tuple:
+    """Copy the map at ``path`` into the static folder if it changed.
+
+    Returns the versioned URL (relative to the app root) and the document.
+    """
+    path = Path(path)
+    if not path.is_absolute():
+        path = ROOT / path
+    stat = path.stat()
+    with _lock:
+        entry = _published.get(path)
+        if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            content = path.read_bytes()
+            digest = hashlib.sha256(content).hexdigest()[:16]
+            target = STATIC_MAPS_DIR / (name or static_name(path))
+            if not target.exists() or target.read_bytes() != content:
+                _write(target, content)
+            url = f"app/static/maps/{quote(target.name)}?v={digest}"
+            entry = (stat.st_mtime_ns, stat.st_size, url, content.decode("utf-8"))
+            _published[path] = entry
+        return entry[2], entry[3]
+
+
+def static_map_html(path, name=None) -> str:
+    """Document to pass to ``components.html`` for the map at ``path``."""
+    url, html = publish(path, name)
+    if not config.get_option("server.enableStaticServing"):
+        return html
+    return _LOADER.format(url=json.dumps(url))
+
+
+def show_map(name, height, scrolling=False) -> None:
+    """Embed the artifact ``name`` of ``data.build`` in the page."""
+    try:
+        path = map_path(name)
+    except ArtifactUnavailable as e:
+        (st.info if e.building else st.error)(str(e))
+        return
+    components.html(static_map_html(path), height=height, scrolling=scrolling)
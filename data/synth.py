@@ -0,0 +1,309 @@
+"""Synthetic copies of the raw inputs for scale testing.
+
+The real journal CSV and the relation and spot CSVs are Git LFS pointers in
+most checkouts. ``generate`` writes a stand-in for every raw input, with the
+file names, sheets and columns the app reads, into a folder that the app,
+the ``python -m data`` steps and the benchmarks use when ``TRAIL_DATA_DIR``
+points at it.
+
+Hikers walk a polyline through the trail towns from Springer Mountain to
+Katahdin (most northbound, some southbound, some quitting early) and write
+entries on random days of their hike. The other inputs are derived from
+those entries, so they agree with each other the way the real ones do: the
+relations link hikers of a year who started close together, the workbooks
+hold the labels of the entries of their years and hikers, and the spot
+files the destinations with the highest joy and negative shares per state.
+Output is deterministic for a given scale and seed, byte for byte: the
+workbooks carry a fixed timestamp instead of the time they were written.
+"""
+
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .geo import assign_states, load_trail_states
+from .journal import normalize_names
+from .paths import (
+    BEST_SPOTS_CSV,
+    EMOTIONS_XLSX,
+    JOURNAL_CSV,
+    RELATIONS_CSV,
+    RELATIONS_JSON,
+    TOP_10_EXTRACTION_XLSX,
+    TOP_10_SHEET,
+    TOP_10_XLSX,
+    WORST_SPOTS_CSV,
+)
+
+# Volumes at scale 1, after the shipped inputs: the emotions workbook holds
+# ~13,000 non-neutral entries of 2020-2023 and the top 10% extraction ~3,400
+# entries of 2021-2023, which puts the journal at about 100,000 entries
+HIKERS_PER_YEAR = 300
+ENTRIES_PER_HIKER = 30
+JOURNAL_YEARS = range(2013, 2024)
+RELATION_YEARS = range(2019, 2024)
+EMOTION_YEARS = range(2020, 2024)
+TOP_10_YEARS = range(2021, 2024)
+# Share of a year's hikers in the relations, and mean mentions per such hiker
+RELATION_SHARE = 0.12
+MENTIONS_PER_HIKER = 0.8
+# Mentioned hikers are picked among the nearest starters of the same direction
+MENTION_WINDOW = 8
+SOBO_SHARE = 0.12
+QUIT_SHARE = 0.3
+# Excel's row limit; larger workbooks are sampled down to it
+MAX_SHEET_ROWS = 1_048_575
+# Creation and modification time of the workbooks and of their zip members
+WORKBOOK_TIME = datetime(2024, 1, 1)
+
+# Labels of the entries and their shares, as in the top 10% extraction
+LABELS = {"neutral": 0.597, "joy": 0.118, "fear": 0.116, "surprise": 0.061,
+          "sadness": 0.051, "disgust": 0.036, "anger": 0.021}
+NEGATIVE_LABELS = ["sadness", "disgust", "anger", "fear"]
+INTERACTIONS = ["campfire", "conversation", "share", "meet", "call", "together", "couple", "family",
+                "friend", "pet", "magic", "trail magic", "trail angel", "fest", "festival", "event",
+                "community", "trail town", "shelter", "resupply", "hitch"]
+# Share of entries mentioning no interaction
+NO_INTERACTION_SHARE = 0.5
+
+# (latitude, longitude, trail mile) of towns and landmarks along the trail
+TRAIL = np.array([
+    (34.627, -84.194, 0), (34.990, -83.650, 78), (35.450, -83.810, 165), (35.563, -83.499, 200),
+    (35.893, -82.829, 274), (36.144, -82.416, 343), (36.635, -81.788, 470), (37.327, -80.736, 636),
+    (37.408, -79.913, 727), (38.069, -78.890, 863), (38.918, -78.194, 967), (39.325, -77.729, 1025),
+    (39.721, -77.508, 1066), (40.394, -77.031, 1150), (40.971, -75.141, 1295), (41.200, -74.300, 1360),
+    (41.312, -73.989, 1400), (41.725, -73.477, 1460), (42.472, -73.167, 1575), (42.900, -73.100, 1610),
+    (43.702, -72.290, 1750), (44.271, -71.303, 1860), (44.387, -71.173, 1895), (45.287, -69.501, 2077),
+    (45.904, -68.921, 2198),
+])
+TRAIL_LENGTH = TRAIL[-1, 2]
+# A named destination (shelter, gap, ...) every this many miles
+DESTINATION_MILES = 8
+POSITION_JITTER = 0.01
+
+_ADJECTIVES = ["Blue", "Big", "Lucky", "Happy", "Quiet", "Wild", "Slow", "Rusty", "Sunny", "Muddy",
+               "Little", "Crazy", "Silver", "Red", "Green", "Lost", "Hungry", "Sleepy", "Brave", "Windy",
+               "Stormy", "Salty", "Sweet", "Tall", "Dusty", "Golden", "Jolly", "Misty", "Lonely", "Mighty"]
+_NOUNS = ["Raccoon", "Foot", "Pilot", "Sidewinder", "Peasant", "Moose", "Bear", "Owl", "Turtle", "Fox",
+          "Hawk", "Badger", "Otter", "Trout", "Beaver", "Coyote", "Heron", "Ranger", "Nomad", "Wanderer",
+          "Pickle", "Biscuit", "Noodle", "Pretzel", "Waffle", "Muffin", "Taco", "Bagel", "Pancake", "Cricket",
+          "Firefly", "Acorn", "Pinecone", "Thistle", "Boulder", "Compass", "Lantern", "Kettle", "Sparrow", "Falcon"]
+_SYLLABLES = ["ka", "lo", "mi", "ra", "tu", "ne", "so", "bi", "da", "fe", "gu", "ho", "ji", "ku", "ma", "no",
+              "pe", "ri", "sa", "to"]
+_PLACES = ["Shelter", "Gap", "Lean-to", "Campsite", "Hostel", "Knob", "Springs", "Notch"]
+
+
+def trail_names(n) -> list:
+    """``n`` distinct trail names, distinct also once normalized to letters."""
+    names = []
+    combos = len(_ADJECTIVES) * len(_NOUNS)
+    for i in range(n):
+        name = f"{_ADJECTIVES[i % len(_ADJECTIVES)]} {_NOUNS[i // len(_ADJECTIVES) % len(_NOUNS)]}"
+        rest = i // combos
+        if rest:
+            suffix = ""
+            while rest:
+                rest, k = divmod(rest - 1, len(_SYLLABLES))
+                suffix = _SYLLABLES[k] + suffix
+            name += " " + suffix.capitalize()
+        names.append(name)
+    return names
+
+
+def _destinations() -> pd.DataFrame:
+    miles = np.arange(DESTINATION_MILES / 2, TRAIL_LENGTH, DESTINATION_MILES)
+    names = [f"{_NOUNS[i % len(_NOUNS)]} {_PLACES[i // len(_NOUNS) % len(_PLACES)]}" for i in range(len(miles))]
+    return pd.DataFrame({"Destination": names, "mile": miles})
+
+
+def trail_position(miles):
+    """Latitude and longitude of the points ``miles`` along the trail."""
+    return np.interp(miles, TRAIL[:, 2], TRAIL[:, 0]), np.interp(miles, TRAIL[:, 2], TRAIL[:, 1])
+
+
+def _interaction_pool(rng, size=256):
+    pool = ["[]"]
+    for _ in range(size - 1):
+        kinds = rng.choice(INTERACTIONS, size=rng.integers(1, 4), replace=False)
+        pool.append(str(kinds.tolist()))
+    weights = np.full(size, (1 - NO_INTERACTION_SHARE) / (size - 1))
+    weights[0] = NO_INTERACTION_SHARE
+    return np.array(pool, dtype=object), weights
+
+
+def _hikers(rng, year, names) -> pd.DataFrame:
+    """One row per hiker of ``year``: name, direction, start, pace and last mile."""
+    n = len(names)
+    sobo = rng.random(n) < SOBO_SHARE
+    start = np.where(sobo, rng.integers(152, 197, n), rng.integers(46, 121, n))
+    return pd.DataFrame({
+        "name": names,
+        "sobo": sobo,
+        "start": pd.Timestamp(f"{year}-01-01") + pd.to_timedelta(start, unit="D"),
+        "pace": np.clip(rng.normal(15, 3, n), 8, 25),
+        "distance": np.where(rng.random(n) < QUIT_SHARE, rng.uniform(30, TRAIL_LENGTH, n), TRAIL_LENGTH),
+    })
+
+
+def _entries(rng, year, hikers, destinations, interactions) -> pd.DataFrame:
+    """Journal entries of the hikers of ``year`` in the journal CSV's columns."""
+    counts = 1 + rng.poisson(ENTRIES_PER_HIKER - 1, len(hikers))
+    h = np.repeat(np.arange(len(hikers)), counts)
+    days_on_trail = (hikers["distance"] / hikers["pace"]).to_numpy()
+    day = np.floor(rng.random(len(h)) * days_on_trail[h])
+    walked = np.clip(day * hikers["pace"].to_numpy()[h] + rng.normal(0, 5, len(h)), 0, hikers["distance"].to_numpy()[h])
+    mile = np.where(hikers["sobo"].to_numpy()[h], TRAIL_LENGTH - walked, walked)
+    lat, lon = trail_position(mile)
+    nearest = np.clip(np.round((mile - DESTINATION_MILES / 2) / DESTINATION_MILES).astype(int), 0, len(destinations) - 1)
+    date = hikers["start"].to_numpy()[h] + pd.to_timedelta(day, unit="D").to_numpy()
+    entries = pd.DataFrame({
+        "Hiker trail name": hikers["name"].to_numpy()[h],
+        "date": pd.DatetimeIndex(date).strftime("%Y-%m-%d"),
+        "Latitude": (lat + rng.normal(0, POSITION_JITTER, len(h))).round(5),
+        "Longitude": (lon + rng.normal(0, POSITION_JITTER, len(h))).round(5),
+        "Unique Interactions": rng.choice(interactions[0], len(h), p=interactions[1]),
+        "Destination": destinations["Destination"].to_numpy()[nearest],
+        "label": rng.choice(list(LABELS), len(h), p=list(LABELS.values())),
+        "year": year,
+    })
+    # Journals are ordered by hiker and date
+    return entries.sort_values(["Hiker trail name", "date"], kind="stable", ignore_index=True)
+
+
+def _relations(rng, hikers) -> dict:
+    """``{hiker: [mentions]}`` of the relation hikers of one year, by normalized name."""
+    chosen = hikers[rng.random(len(hikers)) < RELATION_SHARE].sort_values(["sobo", "start"])
+    names = normalize_names(chosen["name"]).tolist()
+    relations = {}
+    for i, name in enumerate(names):
+        near = names[max(0, i - MENTION_WINDOW):i] + names[i + 1:i + 1 + MENTION_WINDOW]
+        k = min(rng.poisson(MENTIONS_PER_HIKER), len(near))
+        relations[name] = sorted(rng.choice(near, k, replace=False).tolist()) if k else []
+    return relations
+
+
+def _sheet_rows(rng, df) -> pd.DataFrame:
+    if len(df) > MAX_SHEET_ROWS:
+        df = df.iloc[np.sort(rng.choice(len(df), MAX_SHEET_ROWS, replace=False))]
+    return df.reset_index(drop=True)
+
+
+def _day_columns(date) -> dict:
+    return {"year": date.dt.year, "Month": date.dt.strftime("%b"), "DayName": date.dt.strftime("%a"),
+            "DayNo": date.dt.day}
+
+
+def _spots(entries, states) -> tuple:
+    """Destinations with the highest joy and negative shares of every state."""
+    located = entries.assign(State=assign_states(entries["Latitude"], entries["Longitude"], states))
+    located = located.dropna(subset=["State"])
+    spots = located.groupby(["State", "Destination"]).agg(
+        entries=("label", "size"),
+        joy=("label", lambda s: (s == "joy").mean()),
+        negative=("label", lambda s: s.isin(NEGATIVE_LABELS).mean()),
+        Latitude=("Latitude", "median"),
+        Longitude=("Longitude", "median"),
+    ).reset_index()
+    # Spots with few entries have extreme shares
+    spots = spots[spots["entries"] >= spots.groupby("State")["entries"].transform("median")]
+    columns = ["State", "Destination"]
+    best = spots.loc[spots.groupby("State")["joy"].idxmax()]
+    best = best[columns + ["joy", "Latitude", "Longitude"]].round({"joy": 3, "Latitude": 5, "Longitude": 5})
+    worst = spots.loc[spots.groupby("State")["negative"].idxmax()].rename(columns={"negative": "Negative Score"})
+    worst = worst[columns + ["Negative Score", "Latitude", "Longitude"]].round({"Negative Score": 3, "Latitude": 5, "Longitude": 5})
+    return best.reset_index(drop=True), worst.reset_index(drop=True)
+
+
+def _write_workbook(path, sheet, df) -> None:
+    """Write ``df`` to the workbook ``path``, stamped with ``WORKBOOK_TIME``.
+
+    openpyxl records the current time in the document properties and in
+    every zip member, so the saved archive is rewritten with fixed ones.
+    """
+    buffer = io.BytesIO()
+    df.to_excel(buffer, sheet_name=sheet, index=False, engine="openpyxl")
+    stamp = WORKBOOK_TIME.strftime("%Y-%m-%dT%H:%M:%SZ").encode()
+    with zipfile.ZipFile(buffer) as src, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == "docProps/core.xml":
+                data = re.sub(rb"(<dcterms:(?:created|modified)[^>]*>)[^<]*", rb"\g<1>" + stamp, data)
+            dst.writestr(zipfile.ZipInfo(info.filename, WORKBOOK_TIME.timetuple()[:6]), data, zipfile.ZIP_DEFLATED)
+
+
+def generate(out_dir, scale=1.0, seed=0) -> dict:
+    """Write synthetic raw inputs at ``scale`` times the real volume into ``out_dir``.
+
+    Returns the number of rows written per file name.
+    """
+    rng = np.random.default_rng(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    journal, relations_json, relations_csv, emotions_xlsx, extraction_xlsx, top_10_xlsx, best_csv, worst_csv = (
+        out_dir / path.name for path in [JOURNAL_CSV, RELATIONS_JSON, RELATIONS_CSV, EMOTIONS_XLSX,
+                                         TOP_10_EXTRACTION_XLSX, TOP_10_XLSX, BEST_SPOTS_CSV, WORST_SPOTS_CSV]
+    )
+    per_year = max(1, round(HIKERS_PER_YEAR * scale))
+    # Some hikers come back in later years
+    pool = trail_names(per_year * len(JOURNAL_YEARS) // 2)
+    destinations = _destinations()
+    interactions = _interaction_pool(rng)
+
+    rows = {}
+    relations = {}
+    emotions, top_10, spot_sample = [], [], []
+    tmp = journal.with_suffix(".csv.tmp")
+    for i, year in enumerate(JOURNAL_YEARS):
+        hikers = _hikers(rng, year, rng.choice(pool, min(per_year, len(pool)), replace=False))
+        entries = _entries(rng, year, hikers, destinations, interactions)
+        entries.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows[journal.name] = rows.get(journal.name, 0) + len(entries)
+
+        if year in RELATION_YEARS:
+            relations[str(year)] = _relations(rng, hikers)
+        date = pd.to_datetime(entries["date"])
+        labeled = entries["label"] != "neutral"
+        if year in EMOTION_YEARS:
+            emotions.append(pd.DataFrame({"date": date[labeled], "DAY": date[labeled].dt.strftime("%a"),
+                                          "MONTH": date[labeled].dt.strftime("%b"), "YEAR": year,
+                                          "label": entries.loc[labeled, "label"]}))
+        if year in TOP_10_YEARS:
+            # Entries of the hikers who walked furthest
+            top = hikers.nlargest(max(1, len(hikers) // 10), "distance")["name"]
+            mine = entries[entries["Hiker trail name"].isin(top)]
+            top_10.append(pd.DataFrame({**_day_columns(pd.to_datetime(mine["date"])),
+                                        "label": mine["label"], "Hiker trail name": mine["Hiker trail name"]}))
+        spot_sample.append(entries.sample(min(len(entries), 20_000), random_state=seed + i))
+    tmp.replace(journal)
+
+    with open(relations_json, "w") as f:
+        json.dump(relations, f, indent=4)
+    edges = pd.DataFrame(
+        [(int(year), hiker, ",".join(mentions)) for year, by_hiker in relations.items()
+         for hiker, mentions in by_hiker.items()],
+        columns=["Year", "Hiker", "Mentioned Hikers"],
+    )
+    edges.to_csv(relations_csv, index=False)
+    rows[relations_json.name] = rows[relations_csv.name] = len(edges)
+
+    top_10 = _sheet_rows(rng, pd.concat(top_10, ignore_index=True))
+    sheets = [
+        (emotions_xlsx, "Sheet1", _sheet_rows(rng, pd.concat(emotions, ignore_index=True))),
+        (extraction_xlsx, "Sheet1", top_10.drop(columns="Hiker trail name")),
+        (top_10_xlsx, TOP_10_SHEET, top_10),
+    ]
+    for path, sheet, df in sheets:
+        _write_workbook(path, sheet, df)
+        rows[path.name] = len(df)
+
+    best, worst = _spots(pd.concat(spot_sample, ignore_index=True), load_trail_states())
+    for path, df in [(best_csv, best), (worst_csv, worst)]:
+        df.to_csv(path, index=False)
+        rows[path.name] = len(df)
+    return rows
@@ -0,0 +1,83 @@
+"""Trail magic counts per year and state.
+
+The per-state assignment of every journal entry is done once at ingest (the
+``State`` column of the journal store), so the yearly counts reduce to one
+grouped count. The aggregate for all years is persisted next to the store and
+kept in memory, and switching years in the dashboard is a lookup.
+"""
+
+import json
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .access import JOURNAL, frame, signature
+from .geo import TRAIL_MILES
+from .interactions import TRAIL_MAGIC, interaction_mask
+from .paths import TRAIL_MAGIC_COUNTS
+
+_lock = threading.Lock()
+_cache = {}  # signature -> counts
+
+
+def build_trail_magic_counts() -> pd.DataFrame:
+    """Trail magic entries per (year, State) over the whole journal store."""
+    df = frame(JOURNAL, columns=["row_id", "year", "State"])
+    # State is only set for entries with valid coordinates inside a trail state
+    df = df.dropna(subset=["State"])
+    df = df[interaction_mask(df["row_id"], [TRAIL_MAGIC])]
+    counts = df.groupby(["year", "State"], observed=True).size().reset_index(name="Trail Magic Count")
+    counts["State"] = counts["State"].astype(str)
+    return counts
+
+
+def _read_counts(current):
+    try:
+        table = pq.read_table(TRAIL_MAGIC_COUNTS)
+    except FileNotFoundError:
+        return None
+    stored = (table.schema.metadata or {}).get(b"source_signature")
+    if stored is None or json.loads(stored) != current:
+        return None
+    return table.to_pandas()
+
+
+def _write_counts(counts, current):
+    table = pa.Table.from_pandas(counts, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"source_signature": json.dumps(current).encode(),
+    })
+    TRAIL_MAGIC_COUNTS.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, TRAIL_MAGIC_COUNTS)
+
+
+def trail_magic_counts() -> pd.DataFrame:
+    """Cached trail magic counts for every year, rebuilt when the journal changes."""
+    current = signature(JOURNAL)
+    key = json.dumps(current)
+    with _lock:
+        if key not in _cache:
+            counts = _read_counts(current)
+            if counts is None:
+                counts = build_trail_magic_counts()
+                _write_counts(counts, current)
+            _cache.clear()
+            _cache[key] = counts
+        return _cache[key]
+
+
+def trail_magic_per_mile(year=None) -> pd.DataFrame:
+    """Trail magic count, trail miles and count per mile of each state.
+
+    Counts are those of ``year``, or of all years when ``year`` is None.
+    """
+    counts = trail_magic_counts()
+    if year is not None:
+        counts = counts[counts["year"] == int(year)]
+    state_counts = counts.groupby("State", sort=False)["Trail Magic Count"].sum().reset_index()
+    state_counts["Trail Miles"] = state_counts["State"].map(TRAIL_MILES)
+    state_counts["Trail Magic per Mile"] = state_counts["Trail Magic Count"] / state_counts["Trail Miles"]
+    return state_counts
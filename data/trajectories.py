@@ -0,0 +1,112 @@
+"""Daily hiker trajectories and the per-day statistics of hiker groups.
+
+Journal positions are irregular: a hiker writes on some days, several times
+on others, and not at all for weeks. ``Trajectories.from_entries`` puts
+every hiker on one common daily grid in a single vectorized pass: entries
+of the same day are averaged, and each grid day between a hiker's first and
+last entry is linearly interpolated between the entries around it, located
+for all (hiker, day) pairs at once with one ``searchsorted`` over the sorted
+(hiker, day) keys. ``Trajectories.group_stats`` reduces the grid to the
+centroid, spread and size of every group on every day with ``bincount``.
+Neither loops over hikers in Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Kilometers per degree of latitude
+KM_PER_DEGREE = 111.195
+
+
+class Trajectories:
+    """Positions of hikers on a daily grid.
+
+    ``hikers`` holds the hikers' names, ``dates`` the grid days, and
+    ``positions`` an array of shape (hikers, days, 2) of (lat, lon), NaN on
+    days before a hiker's first or after their last entry.
+    """
+
+    def __init__(self, hikers, dates, positions):
+        self.hikers = hikers
+        self.dates = dates
+        self.positions = positions
+
+    @classmethod
+    def from_entries(cls, entries: pd.DataFrame, hiker="normalized_name", dates=None):
+        """Trajectories of the hikers of ``entries``.
+
+        ``entries`` needs ``hiker``, ``date``, ``Latitude`` and ``Longitude``
+        columns; rows missing one of them are ignored. The grid spans the
+        entries' days unless ``dates`` gives the daily grid, in which case
+        entries outside it are ignored.
+        """
+        d = entries.dropna(subset=[hiker, "date", "Latitude", "Longitude"])
+        if dates is None:
+            day = d["date"].dt.normalize()
+            dates = pd.date_range(day.min(), day.max(), freq="D") if len(d) else pd.DatetimeIndex([])
+        elif len(dates):
+            d = d[(d["date"] >= dates[0]) & (d["date"] < dates[-1] + pd.Timedelta(days=1))]
+        codes, hikers = pd.factorize(d[hiker].astype(str), sort=True)
+        n_hikers, n_days = len(hikers), len(dates)
+        positions = np.full((n_hikers, n_days, 2), np.nan)
+        if n_hikers == 0 or n_days == 0:
+            return cls(hikers.to_numpy(), dates, positions)
+
+        # Daily mean position of every (hiker, day), sorted by hiker then day
+        t = ((d["date"] - dates[0]) // pd.Timedelta(days=1)).to_numpy()
+        keys, inverse = np.unique(codes.astype(np.int64) * n_days + t, return_inverse=True)
+        count = np.bincount(inverse)
+        lat = np.bincount(inverse, weights=d["Latitude"].to_numpy(float)) / count
+        lon = np.bincount(inverse, weights=d["Longitude"].to_numpy(float)) / count
+        sample_t = keys % n_days
+
+        # First and last sample of every hiker
+        first = np.searchsorted(keys, np.arange(n_hikers) * n_days)[:, None]
+        last = np.searchsorted(keys, (np.arange(n_hikers) + 1) * n_days)[:, None] - 1
+
+        # Last sample at or before each grid day, for all (hiker, day) at once
+        grid = np.arange(n_days)[None, :]
+        left = np.searchsorted(keys, np.arange(n_hikers)[:, None] * n_days + grid, side="right") - 1
+        valid = (left >= first) & (grid <= sample_t[last])
+        left = np.clip(left, first, last)
+        right = np.minimum(left + 1, last)
+        t0, t1 = sample_t[left], sample_t[right]
+        w = np.where(t1 > t0, (grid - t0) / np.maximum(t1 - t0, 1), 0.0)
+        positions[..., 0] = np.where(valid, lat[left] + w * (lat[right] - lat[left]), np.nan)
+        positions[..., 1] = np.where(valid, lon[left] + w * (lon[right] - lon[left]), np.nan)
+        return cls(hikers.to_numpy(), dates, positions)
+
+    @property
+    def active(self) -> np.ndarray:
+        """(hikers, days) mask of the days with a position."""
+        return ~np.isnan(self.positions[..., 0])
+
+    def group_stats(self, groups):
+        """Centroid, spread and size of every group on every day.
+
+        ``groups`` holds a group code from 0 for every hiker. Returns arrays
+        of shape (groups, days, 2) with the centroid (lat, lon), (groups,
+        days) with the spread, the root mean square distance in kilometers of
+        the group's hikers from its centroid, and (groups, days) with the
+        number of hikers with a position. Centroid and spread are NaN on days
+        without any hiker of the group.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        n_days = len(self.dates)
+        active = self.active
+        flat = (groups[:, None] * n_days + np.arange(n_days)[None, :])[active]
+        lat = self.positions[..., 0][active]
+        lon = self.positions[..., 1][active]
+
+        size = n_groups * n_days
+        count = np.bincount(flat, minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            center_lat = np.bincount(flat, weights=lat, minlength=size) / count
+            center_lon = np.bincount(flat, weights=lon, minlength=size) / count
+            dy = (lat - center_lat[flat]) * KM_PER_DEGREE
+            dx = (lon - center_lon[flat]) * KM_PER_DEGREE * np.cos(np.radians(center_lat[flat]))
+            spread = np.sqrt(np.bincount(flat, weights=dx * dx + dy * dy, minlength=size) / count)
+
+        centroids = np.stack([center_lat, center_lon], axis=-1).reshape(n_groups, n_days, 2)
+        return centroids, spread.reshape(n_groups, n_days), count.reshape(n_groups, n_days)
@@ -0,0 +1,109 @@
+"""Typed Parquet sidecars for the Excel workbooks of the Emotions Dashboard.
+
+Parsing ``.xlsx`` with openpyxl is by far the slowest step of loading the
+emotion data. ``read_sheet`` converts a sheet into a typed Parquet file under
+``data_store/workbooks`` on first use and reads that file afterwards. A
+sidecar is reused while the workbook's size and mtime are unchanged, or when
+its content hash still matches after a touch; otherwise it is rebuilt.
+"""
+
+import json
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .fingerprint import file_sha256
+from .paths import WORKBOOKS_DIR
+
+# Bump whenever the typed layout of the sidecars changes
+WORKBOOK_VERSION = 1
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+
+def sidecar_path(path, sheet_name=0):
+    sheet = re.sub(r"[^A-Za-z0-9_-]+", "_", str(sheet_name))
+    return WORKBOOKS_DIR / f"{path.stem}.{sheet}.parquet"
+
+
+def parse_dates(df: pd.DataFrame) -> pd.Series:
+    """Entry dates of a sheet, parsed column-wise.
+
+    Sheets with ``year``/``Month``/``DayNo`` columns (month as a name or an
+    abbreviation) are assembled from those; otherwise the ``date`` column is
+    parsed as ``%m/%d/%y`` unless Excel already typed it. Unparseable dates
+    become NaT.
+    """
+    if {"year", "Month", "DayNo"}.issubset(df.columns):
+        month = df["Month"].astype(str).str.strip().str[:3].str.lower().map(MONTHS)
+        month = month.fillna(pd.to_numeric(df["Month"], errors="coerce"))
+        parts = pd.DataFrame({
+            "year": pd.to_numeric(df["year"], errors="coerce"),
+            "month": month,
+            "day": pd.to_numeric(df["DayNo"], errors="coerce"),
+        })
+        return pd.to_datetime(parts, errors="coerce")
+    if pd.api.types.is_datetime64_any_dtype(df["date"]):
+        return df["date"]
+    return pd.to_datetime(df["date"], format="%m/%d/%y", errors="coerce")
+
+
+def _typed_sheet(path, sheet_name) -> pd.DataFrame:
+    df = pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
+    # Drop the pivot-table spill columns some workbooks carry next to the data
+    df = df.loc[:, ~df.columns.astype(str).str.startswith("Unnamed:")].copy()
+    df["date"] = parse_dates(df)
+    for col in df.columns[df.dtypes == object]:
+        # Cells typed differently within one column cannot share an Arrow type
+        if pd.api.types.infer_dtype(df[col], skipna=True) not in ("string", "empty"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _source(path) -> dict:
+    stat = path.stat()
+    return {"version": WORKBOOK_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_sidecar(path, sidecar):
+    try:
+        table = pq.read_table(sidecar)
+    except FileNotFoundError:
+        return None
+    stored = json.loads((table.schema.metadata or {}).get(b"workbook_source", b"{}"))
+    source = _source(path)
+    if stored.get("source") == source:
+        return table
+    if stored.get("source", {}).get("version") == WORKBOOK_VERSION and stored.get("sha256") == file_sha256(path):
+        # Same content under a new mtime (e.g. a fresh checkout): refresh the stamp only
+        _write_sidecar(table, sidecar, source, stored["sha256"])
+        return table
+    return None
+
+
+def _write_sidecar(table, sidecar, source, sha256) -> None:
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"workbook_source": json.dumps({"source": source, "sha256": sha256}).encode(),
+    })
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    tmp = sidecar.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp)
+    tmp.replace(sidecar)
+
+
+def read_sheet_table(path, sheet_name=0) -> pa.Table:
+    """Typed Arrow table of a workbook sheet, through its Parquet sidecar."""
+    sidecar = sidecar_path(path, sheet_name)
+    table = _read_sidecar(path, sidecar)
+    if table is None:
+        table = pa.Table.from_pandas(_typed_sheet(path, sheet_name), preserve_index=False)
+        _write_sidecar(table, sidecar, _source(path), file_sha256(path))
+    return table
+
+
+def read_sheet(path, sheet_name=0) -> pd.DataFrame:
+    return read_sheet_table(path, sheet_name).to_pandas()
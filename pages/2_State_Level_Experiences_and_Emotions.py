@@ -7,13 +7,12 @@ st.set_page_config(
      initial_sidebar_state="expanded"
  )
 
-import streamlit.components.v1 as components
 import pandas as pd
 import os
-import geopandas as gpd
-import folium
-from shapely.geometry import Point
-from streamlit_folium import st_folium
+
+from data.choropleth import choropleth_name
+from data.paths import BEST_SPOTS_CSV, WORST_SPOTS_CSV
+from data.static_maps import show_map
 
 st.title("State Level Experiences and Emotions Maps")  
 
@@ -28,16 +27,14 @@ tab_titles = [
 
 tabs = st.tabs(tab_titles)
 
-top_joy = pd.read_csv("best spots.csv")
-top_negative = pd.read_csv("worst spots.csv")
+top_joy = pd.read_csv(BEST_SPOTS_CSV)
+top_negative = pd.read_csv(WORST_SPOTS_CSV)
 
 with tabs[0]:
     st.header("Most and Least Enjoyable Locations of the Trail in Each State📍")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("best and worst spots.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=600, scrolling=True)
+        show_map("best and worst spots.html", height=600, scrolling=True)
 
         legend_col, joy_col, neg_col = st.columns([0.65, 2, 2])
 
@@ -91,9 +88,7 @@ with tabs[1]:
     st.header("Trail Magic Occurences by State 🪄")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("trail magic state map.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=600, scrolling=True)
+        show_map("trail magic state map.html", height=600, scrolling=True)
 
     with col2:
         with st.container(border=True):
@@ -119,9 +114,7 @@ with tabs[2]:
     st.subheader("Click on the next tab to see the trail magic per mile for every year!")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("trail_magic_per_mile_map.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=600, scrolling=True)
+        show_map("trail_magic_per_mile_map.html", height=600, scrolling=True)
 
     with col2:
         with st.container(border=True):
@@ -147,69 +140,8 @@ with tabs[3]:
 
     selected_year = st.selectbox("Select a year", list(range(2013, 2024)), index=10)
 
-    df = pd.read_csv('CLEANED_CS6724_data_2013_2023.csv', encoding='ISO-8859-1', low_memory=False,
-                     usecols=['Destination', 'Unique Interactions', 'Latitude', 'Longitude', 'year'])
-
-    df = df[df['year'] == selected_year]
-    df = df.dropna(subset=['Latitude', 'Longitude'])
-    df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
-    df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
-    df = df.dropna(subset=['Latitude', 'Longitude'])
-    df = df[df['Unique Interactions'].astype(str).str.contains("'trail magic'", na=False)]
-
-    trail_states = ["Georgia", "North Carolina", "Tennessee", "Virginia", "West Virginia",
-                    "Maryland", "Pennsylvania", "New Jersey", "New York", "Connecticut",
-                    "Massachusetts", "Vermont", "New Hampshire", "Maine"]
-
-    trail_miles = {
-        "Georgia": 79, "North Carolina": 96, "Tennessee": 293, "Virginia": 554, "West Virginia": 4,
-        "Maryland": 41, "Pennsylvania": 229, "New Jersey": 72, "New York": 88, "Connecticut": 52,
-        "Massachusetts": 90, "Vermont": 150, "New Hampshire": 161, "Maine": 282
-    }
-
-    states = gpd.read_file("https://raw.githubusercontent.com/PublicaMundi/MappingAPI/master/data/geojson/us-states.json")
-    states = states[states["name"].isin(trail_states)].copy()
-
-    geometry = [Point(lon, lat) for lon, lat in zip(df['Longitude'], df['Latitude'])]
-    gdf = gpd.GeoDataFrame(df, geometry=geometry, crs='EPSG:4326')
-    gdf = gpd.sjoin(gdf, states, how="left", predicate='within')
-    df['State'] = gdf['name']
-    df = df.dropna(subset=['State'])
-
-    state_counts = df.groupby('State').size().reset_index(name='Trail Magic Count')
-    state_counts["Trail Miles"] = state_counts["State"].map(trail_miles)
-    state_counts["Trail Magic per Mile"] = state_counts["Trail Magic Count"] / state_counts["Trail Miles"]
-    states = states.merge(state_counts, left_on='name', right_on='State', how='left')
-    states["Trail Magic per Mile"] = states["Trail Magic per Mile"].fillna(0)
-
-    m = folium.Map(location=[39.5, -77.5], zoom_start=5, tiles='OpenStreetMap')
-    folium.Choropleth(
-        geo_data=states.to_json(),
-        name="Trail Magic per Mile",
-        data=states,
-        columns=["name", "Trail Magic per Mile"],
-        key_on="feature.properties.name",
-        fill_color="YlGnBu",
-        fill_opacity=0.7,
-        line_opacity=0.5,
-        legend_name="Trail Magic Events per Mile",
-        highlight=True
-    ).add_to(m)
-
-    folium.GeoJson(
-        states,
-        tooltip=folium.GeoJsonTooltip(
-            fields=["name", "Trail Magic Count", "Trail Miles", "Trail Magic per Mile"],
-            aliases=["State: ", "Trail Magic Count: ", "Trail Miles: ", "Per Mile: "],
-            localize=True
-        )
-    ).add_to(m)
-
-    m.get_root().html.add_child(folium.Element(
-        f"<h4 align='center' style='font-size:18px;'>Trail Magic per Mile in {selected_year}</h4>"
-    ))
-
-    st_data = st_folium(m, width=1000, height=600)
+    # Maps of every year are prebuilt by `python -m data choropleth`
+    show_map(choropleth_name(selected_year), height=600)
 
 
 
@@ -217,9 +149,8 @@ with tabs[4]:
     st.header("Negative Emotions of NOBO Hikers Across the Trail 👎⬆️")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("neg_emotions_markers_NOBO.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=600, scrolling=True)
+        # Clustered map built from the journal store (data.emotion_maps)
+        show_map("neg_emotions_markers_NOBO.html", height=600, scrolling=True)
 
         st.markdown(
         """
@@ -271,9 +202,8 @@ with tabs[5]:
     st.header("Negative Emotions of SOBO Hikers Across the Trail 👎⬇️")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("neg_emotions_markers_SOBO.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=600, scrolling=True)
+        # Clustered map built from the journal store (data.emotion_maps)
+        show_map("neg_emotions_markers_SOBO.html", height=600, scrolling=True)
 
         st.markdown(
         """
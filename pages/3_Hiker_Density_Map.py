@@ -5,8 +5,8 @@ st.set_page_config(
      initial_sidebar_state="expanded"
  )
 
-import streamlit.components.v1 as components
-import os
+
+from data.static_maps import show_map
 
 st.title("📍 Hiker Density Interactive Heatmap")
 
@@ -15,11 +15,7 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     # Load the HTML map
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    html_path = os.path.join(script_dir, "interactive_hikers_map.html")
-    with open(html_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
-    components.html(html_content, height=600, scrolling=True)
+    show_map("interactive_hikers_map.html", height=600, scrolling=True)
 
     # Legend stays below the map
     st.markdown(
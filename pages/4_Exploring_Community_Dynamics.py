@@ -25,6 +25,13 @@ import plotly.express as px
 from pyvis.network import Network
 import streamlit.components.v1 as components
 
+from data import HIKER_RELATIONS, JOURNAL, frame, signature
+from data.animations import animation_path, group_sizes, request_animation
+from data.communities import artifact_id, community_activeness, load_communities, node_groups
+from data.group_player import group_payload, player_html
+from data.layout import community_layout
+from data.relations import year_graphs
+
 st.title("Exploring Community Dynamics")  
 
 tab_titles = [
@@ -40,23 +47,64 @@ with tabs[0]:
     col1, col2 = st.columns([2, 1])
     with col1:
         st.markdown("## Select Year and Group")
-        years = list(range(2019, 2024)) 
-        groups = list(range(10))         
+        communities = load_communities()
+        years = sorted(int(year) for year in communities["years"])
 
         col1a, col2a = st.columns(2)
         selected_year = col1a.selectbox("Year", years)
-        selected_group = col2a.selectbox("Group ID", groups)
+        sizes = group_sizes(communities, selected_year)
+        selected_group = col2a.selectbox("Group ID", sorted(sizes), format_func=lambda g: f"{g} ({sizes[g]} hikers)")
 
-        video_path = Path(f"static_mp4s/Group_{selected_group}_{selected_year}.mp4")
         st.markdown("<h3 style='text-align: center;'>Group Movement Animation</h3>", unsafe_allow_html=True)
+        mode = st.radio("Playback", ["Video", "Interactive"], horizontal=True,
+                        help="Interactive mode animates the groups in the browser and can overlay several groups.")
 
-        if video_path.exists():
-            _, middle, _ = st.columns([1, 10, 1]) 
+        @st.cache_data(max_entries=64)
+        def group_animation_html(year, groups, journal_signature, artifact_name):
+            return player_html(group_payload(load_communities(), year, groups))
 
-            with middle:
-                st.video(str(video_path))
-        else:
+        if selected_group is None:
             st.warning("No animation found for this group and year.")
+        elif mode == "Interactive":
+            overlay = st.multiselect("Groups", sorted(sizes), default=[selected_group],
+                                     format_func=lambda g: f"{g} ({sizes[g]} hikers)")
+            if overlay:
+                # Only the members' quantized daily positions are sent; the browser draws the frames
+                artifact_name = artifact_id(communities)
+                html = group_animation_html(selected_year, tuple(overlay), str(signature(JOURNAL)), artifact_name)
+                components.html(html, height=650)
+            else:
+                st.info("Select at least one group.")
+        else:
+            # Rendered once in a worker process, then cached until the data changes
+            video_path = animation_path(communities, selected_year, selected_group)
+            future = None
+            if not video_path.exists():
+                # The session keeps its own request, so a failed render is not retried on every rerun
+                key = f"animation:{video_path}"
+                if key not in st.session_state:
+                    st.session_state[key] = request_animation(selected_year, selected_group, communities)
+                future = st.session_state[key]
+
+            if future is not None and not future.done():
+                @st.fragment(run_every=1)
+                def wait_for_animation():
+                    # Polls the render without holding up the rest of the page
+                    if future.done():
+                        st.rerun()
+                    st.info("Rendering the animation...")
+
+                wait_for_animation()
+            elif future is None or future.exception() is None:
+                _, middle, _ = st.columns([1, 10, 1])
+
+                with middle:
+                    if video_path.suffix == ".mp4":
+                        st.video(str(video_path))
+                    else:
+                        st.image(str(video_path))
+            else:
+                st.warning(f"No animation found for this group and year: {future.exception()}")
     
     with col2:
         with st.container(border=True):
@@ -86,43 +134,28 @@ with tabs[1]:
     col1, col2 = st.columns([2, 1])
     with col1:
         # === Load data ===
-        df = pd.read_csv("CLEANED_CS6724_data_2013_2023.csv")
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df[df["date"].notna()]
-        df["normalized_name"] = df["Hiker trail name"].astype(str).str.strip().str.lower().str.replace(r"[^a-z]", "", regex=True)
+        @st.cache_data(max_entries=4)
+        def community_statistics(journal_signature, artifact_name):
+            df = frame(JOURNAL, columns=["date", "normalized_name"])
+            return community_activeness(df, load_communities())
 
-        with open("cleaned_yearly_hiker_relations.json") as f:
-            cleaned_yearly_hiker_relations = json.load(f)
+        communities = load_communities()
+        community_stats = community_statistics(str(signature(JOURNAL)), artifact_id(communities))
 
         # Containers
+        community_ids_by_year = {}
         community_sizes_by_year = {}
         community_count_by_year = {}
         community_activeness_by_year = {}
 
-        # Calculate community data
-        years = sorted([str(y) for y in cleaned_yearly_hiker_relations.keys()])
+        # Community data precomputed by `python -m data communities`
+        years = sorted(communities["years"].keys())
         for year in years:
-            year_int = int(year)
-            relations = cleaned_yearly_hiker_relations[year]
-
-            G = nx.Graph([(h, m) for h, ms in relations.items() for m in ms])
-            partition = community_louvain.best_partition(G, random_state=42)
-
-            community_hikers = defaultdict(set)
-            for hiker, cid in partition.items():
-                community_hikers[cid].add(hiker)
-
-            sizes = [len(members) for members in community_hikers.values()]
-            community_sizes_by_year[year] = sizes
-            community_count_by_year[year] = len(sizes)
-
-            df_year = df[df["date"].dt.year == year_int].copy()
-            community_activeness = []
-            for cid, hikers in community_hikers.items():
-                entry_count = df_year[df_year["normalized_name"].isin(hikers)].shape[0]
-                community_activeness.append(entry_count)
-
-            community_activeness_by_year[year] = community_activeness
+            stats = community_stats[community_stats["year"] == year]
+            community_ids_by_year[year] = stats["community"].tolist()
+            community_sizes_by_year[year] = stats["size"].tolist()
+            community_count_by_year[year] = len(stats)
+            community_activeness_by_year[year] = stats["entries"].tolist()
 
         # 1. Number of Communities per Year
         num_communities = [community_count_by_year[y] for y in years]
@@ -185,9 +218,10 @@ with tabs[1]:
         # 5. Hikers in Each Community
         data5 = []
         for year in years:
-            sizes = community_sizes_by_year[year]
-            for i, size in enumerate(sizes):
-                data5.append({"Year": int(year), "Group": i, "Size": size})
+            # Group ids are stable across years (see data.communities)
+            year_sizes = community_sizes_by_year[year]
+            for group, size in zip(community_ids_by_year[year], year_sizes):
+                data5.append({"Year": int(year), "Group": group, "Size": size})
 
         df_sizes = pd.DataFrame(data5)
         df_sizes["Label"] = df_sizes["Year"].astype(str) + "_G" + df_sizes["Group"].astype(str)
@@ -232,44 +266,23 @@ with tabs[2]:
 
     col1, col2 = st.columns([2,1])
     with col1:
-        @st.cache_data
-        def load_cleaned_hiker_relations():
-            df = pd.read_csv("cleaned_yearly_hiker_relations.csv")
-            df["Mentioned Hikers"] = df["Mentioned Hikers"].fillna("")
-
-            yearly_relations = {}
-            for year in sorted(df["Year"].unique()):
-                year_df = df[df["Year"] == year]
-                G = {}
-                for _, row in year_df.iterrows():
-                    hiker = row["Hiker"].strip().lower()
-                    mentions = [m.strip().lower() for m in row["Mentioned Hikers"].split(",") if m.strip()]
-                    G[hiker] = mentions
-                yearly_relations[year] = G
-            return yearly_relations
-
-        def build_graph(hiker_mentions_dict):
-            G = nx.Graph()
-            for hiker, mentions in hiker_mentions_dict.items():
-                G.add_node(hiker)
-                for mention in mentions:
-                    G.add_edge(hiker, mention)
-            return G
-
-        def show_pyvis_graph(G, partition):
-            net = Network(height="600px", width="100%", notebook=False)
-            net.barnes_hut()
-
-            # Map hiker names to anonymized labels
-            mapping = {name: f"Hiker {i+1}" for i, name in enumerate(G.nodes)}
-            G = nx.relabel_nodes(G, mapping)
-            partition = {mapping[k]: v for k, v in partition.items()}
-
-            for node in G.nodes:
-                net.add_node(node, label=node, group=partition.get(node, 0))
-
-            for edge in G.edges:
-                net.add_edge(edge[0], edge[1])
+        # Yearly graphs of the shared relations edge table, the same data the
+        # community statistics are computed from; rebuilt when the table changes
+        @st.cache_resource
+        def load_relation_graphs(relations_signature):
+            return year_graphs(frame(HIKER_RELATIONS))
+
+        def pyvis_graph_html(graph, groups, xy):
+            # Remote vis.js resources: nothing is written next to the app
+            net = Network(height="600px", width="100%", notebook=False, cdn_resources="remote")
+
+            # Nodes are shown under their anonymized labels only, at the
+            # positions precomputed with the communities (no browser physics)
+            labels = graph.labels.tolist()
+            for label, group, (x, y) in zip(labels, groups.tolist(), xy.tolist()):
+                net.add_node(label, label=label, group=group, x=x, y=y, physics=False)
+            for a, b in graph.edges().tolist():
+                net.add_edge(labels[a], labels[b])
 
             net.set_options("""
             var options = {
@@ -286,30 +299,41 @@ with tabs[2]:
                 "smooth": false
             },
             "physics": {
-                "barnesHut": {
-                "gravitationalConstant": -8000,
-                "centralGravity": 0.3,
-                "springLength": 95
-                },
-                "minVelocity": 0.75
+                "enabled": false
             }
             }
             """)
 
-            net.save_graph("pyvis_graph.html")
-            HtmlFile = open("pyvis_graph.html", "r", encoding="utf-8")
-            components.html(HtmlFile.read(), height=650)
+            return net.generate_html()
+
+        # Rendered in memory and shared by all sessions, per year and community
+        # artifact (whose name carries the layout version); LRU-bounded
+        @st.cache_data(max_entries=16)
+        def community_graph_html(year, relations_signature, artifact_name):
+            graph = load_relation_graphs(relations_signature)[year]
+            year_communities = load_communities()["years"].get(str(year))
+            if year_communities is None:
+                partition = community_louvain.best_partition(graph.to_networkx(), random_state=42)
+                groups = np.array([partition[i] for i in range(graph.num_nodes)])
+                xy = community_layout(graph, groups)
+            else:
+                groups = node_groups(graph, year_communities)
+                layout = year_communities["layout"]
+                xy = np.array([layout[name] for name in graph.names])
+            return pyvis_graph_html(graph, groups, xy)
 
         # Streamlit UI
         st.title("Hiker Communities with Louvain Detection")
-        yearly_relations = load_cleaned_hiker_relations()
-        selected_year = st.selectbox("Select Year", list(yearly_relations.keys()))
+        relations_signature = str(signature(HIKER_RELATIONS))
+        relation_graphs = load_relation_graphs(relations_signature)
+        selected_year = st.selectbox("Select Year", list(relation_graphs.keys()))
 
         if selected_year:
-            G = build_graph(yearly_relations[selected_year])
-            if G.number_of_nodes() > 0:
-                partition = community_louvain.best_partition(G, random_state=42)
-                show_pyvis_graph(G, partition)
+            graph = relation_graphs[selected_year]
+            if graph.num_nodes > 0:
+                artifact_name = artifact_id(load_communities())
+                html = community_graph_html(selected_year, relations_signature, artifact_name)
+                components.html(html, height=650)
             else:
                 st.warning("No data available for the selected year.")
 
@@ -5,7 +5,8 @@ st.set_page_config(
      initial_sidebar_state="expanded"
  )
 
-import streamlit.components.v1 as components
+
+from data.static_maps import show_map
 
 st.title("Socialness Visualizations")  
 
@@ -21,9 +22,7 @@ with tabs[0]:
     st.header("Social Interactions on hiking trails📍")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("social_interactions_density.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=700, scrolling=True)
+        show_map("social_interactions_density.html", height=700, scrolling=True)
 
     with col2:
         with st.container(border=True):
@@ -54,9 +53,7 @@ with tabs[1]:
     st.header("Social Interactions by Year and Month 🪄")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("bar_chart_socialness.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=700, scrolling=True)
+        show_map("bar_chart_socialness.html", height=700, scrolling=True)
 
     with col2:
         with st.container(border=True):
@@ -88,9 +85,7 @@ with tabs[2]:
     st.header("Monthly Distribution of Social Interactions ☀️")
     col1, col2 = st.columns([2,1])
     with col1:
-        with open("line_chart_socialness.html", "r", encoding="utf-8") as file:
-            map_html = file.read()
-        components.html(map_html, height=700, scrolling=True)
+        show_map("line_chart_socialness.html", height=700, scrolling=True)
 
     with col2:
         with st.container(border=True):
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+
+import data
+from data.emotions import cube_slice, daily_dominant, emotion_cube
 
 # ----------------------------------------------------------------
 # 1) PAGE CONFIG
@@ -62,41 +66,48 @@ tabs = st.tabs([
 # ----------------------------------------------------------------
 # 4) DATA LOADING & PREPROCESSING
 # ----------------------------------------------------------------
-file_path_top_10            = '2025-03-25_Top10Pct.xlsx'
-file_path_emotions          = 'Emotions Visualization Chart.xlsx'
-file_path_top_10_extraction = 'Top Ten Percent Data Extraction.xlsx'
-
-df_top_10            = pd.read_excel(file_path_top_10, sheet_name='Top_10pct_Miles_2021-23', engine='openpyxl')
-df_emotions          = pd.read_excel(file_path_emotions, engine='openpyxl')
-df_top_10_extraction = pd.read_excel(file_path_top_10_extraction, engine='openpyxl')
-
-# parse dates & filter target years
-df_top_10['date'] = pd.to_datetime(
-    df_top_10[['year','Month','DayNo']].astype(str).agg('-'.join, axis=1),
-    errors='coerce'
-)
-df_top_10 = df_top_10[df_top_10['date'].dt.year.isin([2021,2022,2023])]
-
-df_emotions['date'] = pd.to_datetime(df_emotions['date'], format='%m/%d/%y', errors='coerce')
-df_emotions = df_emotions[df_emotions['date'].dt.year.isin([2020,2021,2022,2023,2024])]
-
-df_top_10_extraction['date'] = pd.to_datetime(
-    df_top_10_extraction[['year','Month','DayNo']].astype(str).agg('-'.join, axis=1),
-    errors='coerce'
+# Sheets come from typed Parquet sidecars (dates already parsed) and the
+# prepared frames are built once per process and shared by all sessions.
+# They are keyed by the workbook signatures, so editing a workbook rebuilds them.
+@st.cache_resource
+def load_emotion_frames(signatures):
+    df_top_10            = data.frame(data.TOP_10)
+    df_emotions          = data.frame(data.EMOTIONS)
+    df_top_10_extraction = data.frame(data.TOP_10_EXTRACTION)
+
+    # filter target years
+    df_top_10            = df_top_10[df_top_10['date'].dt.year.isin([2021,2022,2023])]
+    df_emotions          = df_emotions[df_emotions['date'].dt.year.isin([2020,2021,2022,2023,2024])]
+    df_top_10_extraction = df_top_10_extraction[df_top_10_extraction['date'].dt.year.isin([2021,2022,2023])]
+
+    # filter to allowed emotions
+    allowed = ['sadness','anger','disgust','fear','joy','surprise']
+    df_top_10            = df_top_10   [df_top_10   ['label'].isin(allowed)].copy()
+    df_top_10_extraction = df_top_10_extraction[df_top_10_extraction['label'].isin(allowed)]
+
+    # ------------------------------------------------------------
+    # 5) ANONYMIZE ONLY df_top_10
+    # ------------------------------------------------------------
+    unique_hikers = sorted(df_top_10['Hiker trail name'].unique())
+    anon_map = {orig: f"Hiker {i+1}" for i, orig in enumerate(unique_hikers)}
+    df_top_10['hiker_anon'] = df_top_10['Hiker trail name'].map(anon_map)
+    return df_top_10, df_emotions, df_top_10_extraction
+
+# Monthly counts, totals and proportions of every dataset, shared by all charts
+@st.cache_resource
+def load_emotion_cube(signatures):
+    df_top_10, df_emotions, df_top_10_extraction = load_emotion_frames(signatures)
+    return emotion_cube({
+        'top_10': df_top_10,
+        'emotions': df_emotions,
+        'top_10_extraction': df_top_10_extraction,
+    })
+
+workbook_signatures = tuple(
+    str(data.signature(name)) for name in (data.TOP_10, data.EMOTIONS, data.TOP_10_EXTRACTION)
 )
-df_top_10_extraction = df_top_10_extraction[df_top_10_extraction['date'].dt.year.isin([2021,2022,2023])]
-
-# filter to allowed emotions
-allowed = ['sadness','anger','disgust','fear','joy','surprise']
-df_top_10            = df_top_10   [df_top_10   ['label'].isin(allowed)]
-df_top_10_extraction = df_top_10_extraction[df_top_10_extraction['label'].isin(allowed)]
-
-# ----------------------------------------------------------------
-# 5) ANONYMIZE ONLY df_top_10
-# ----------------------------------------------------------------
-unique_hikers = sorted(df_top_10['Hiker trail name'].unique())
-anon_map = {orig: f"Hiker {i+1}" for i, orig in enumerate(unique_hikers)}
-df_top_10['hiker_anon'] = df_top_10['Hiker trail name'].map(anon_map)
+df_top_10, df_emotions, df_top_10_extraction = load_emotion_frames(workbook_signatures)
+emotion_counts = load_emotion_cube(workbook_signatures)
 
 # ----------------------------------------------------------------
 # 6) COLORS & EMOTION ORDER
@@ -111,6 +122,17 @@ custom_colors = {
 }
 emotion_order = ['joy','surprise','sadness','fear','disgust','anger']
 
+# Dominant emotion of every hiker and day: most entries that day, ties broken
+# by emotion_order. Computed once for all hikers and sliced per hiker.
+@st.cache_resource
+def load_daily_dominant(signatures):
+    df_top_10, _, _ = load_emotion_frames(signatures)
+    dom = daily_dominant(df_top_10, emotion_order)
+    return {key: grp.reset_index(drop=True)
+            for key, grp in dom.groupby([dom['date'].dt.year, 'hiker'])}
+
+daily_emotions = load_daily_dominant(workbook_signatures)
+
 # ----------------------------------------------------------------
 # 7) SIDEBAR: YEAR SELECTOR
 # ----------------------------------------------------------------
@@ -123,10 +145,10 @@ selected_year = st.sidebar.selectbox(
 # ----------------------------------------------------------------
 # 8) GRAPH FUNCTIONS WITH RED‑ON‑SELECT
 # ----------------------------------------------------------------
-def create_hiker_graph(df_h, anon, yr):
-    dom = df_h.groupby('date')\
-              .apply(lambda x: x.loc[x['label'].idxmax()])\
-              .reset_index(drop=True)
+# Memoized per (hiker, year); the signatures drop figures of edited workbooks
+@st.cache_data(max_entries=256)
+def create_hiker_graph(anon, yr, signatures):
+    dom = load_daily_dominant(signatures)[(yr, anon)]
     fig = px.line(
         dom, x='date', y='label',
         title=f"Emotional Fluctuations for {anon} ({yr})",
@@ -147,14 +169,39 @@ def create_hiker_graph(df_h, anon, yr):
     fig.update_traces(hovertemplate='<b>%{x}</b><br>Emotion: %{y}')
     return fig
 
+# All hikers of a year in one heatmap (hiker x day, color = dominant emotion).
+# One z matrix serializes far smaller than a spline figure per hiker.
+@st.cache_data(max_entries=16)
+def create_journeys_heatmap(hikers, yr, signatures):
+    daily = load_daily_dominant(signatures)
+    dom = pd.concat([daily[(yr, anon)] for anon in hikers], ignore_index=True)
+    grid = dom.pivot(index='hiker', columns='date', values='label').reindex(list(hikers))
+    codes = grid.apply(lambda col: col.map({e: i for i, e in enumerate(emotion_order)}))
+
+    # discrete colorscale: one band per emotion
+    n = len(emotion_order)
+    colorscale = []
+    for i, e in enumerate(emotion_order):
+        colorscale += [[i / n, custom_colors[e]], [(i + 1) / n, custom_colors[e]]]
+    fig = go.Figure(go.Heatmap(
+        z=codes.to_numpy(dtype=float), x=grid.columns, y=grid.index,
+        customdata=grid.to_numpy(),
+        zmin=-0.5, zmax=n - 0.5, colorscale=colorscale,
+        colorbar=dict(title='Emotion', tickvals=list(range(n)), ticktext=emotion_order),
+        hovertemplate='<b>%{y}</b> %{x}<br>Emotion: %{customdata}<extra></extra>',
+        hoverongaps=False
+    ))
+    fig.update_layout(
+        title=f"Daily Dominant Emotion of All Hikers ({yr})",
+        xaxis_title='Date', yaxis_title='Hiker',
+        yaxis=dict(autorange='reversed'),
+        height=max(400, 22 * len(hikers) + 150)
+    )
+    return fig
+
 def get_monthly_emotion_trends(yr):
-    d = df_top_10[df_top_10['date'].dt.year==yr]
-    m = d.groupby([d['date'].dt.to_period('M'),'label'])\
-         .size().reset_index(name='count')
-    m['date'] = m['date'].dt.to_timestamp()
-    tot = m.groupby('date')['count'].sum().reset_index(name='total')
-    dm = m.loc[m.groupby('date')['count'].idxmax()].merge(tot, on='date')
-    dm['prop'] = dm['count']/dm['total']
+    m = cube_slice(emotion_counts, 'top_10', yr)
+    dm = m[m['dominant']]
     fig = px.bar(
         dm, x='date', y='count', color='label', text='count',
         labels={'count':'Emotion Count'},
@@ -172,8 +219,9 @@ def get_monthly_emotion_trends(yr):
     return fig
 
 def get_emotion_proportions(yr):
-    d = df_top_10[df_top_10['date'].dt.year==yr]
-    cnt = d['label'].value_counts().rename_axis('Emotion').reset_index(name='count')
+    m = cube_slice(emotion_counts, 'top_10', yr)
+    cnt = m.groupby('label')['count'].sum().sort_values(ascending=False, kind='stable')\
+           .rename_axis('Emotion').reset_index(name='count')
     cnt['prop'] = cnt['count']/cnt['count'].sum()
     fig = px.bar(
         cnt, x='Emotion', y='prop', text='prop',
@@ -190,13 +238,7 @@ def get_emotion_proportions(yr):
     return fig
 
 def get_proportion_bar(yr):
-    d = df_emotions[df_emotions['date'].dt.year==yr]
-    m = d.groupby([d['date'].dt.to_period('M'),'label'])\
-         .size().reset_index(name='count')
-    m['date'] = m['date'].dt.to_timestamp()
-    tot = m.groupby('date')['count'].sum().reset_index(name='total')
-    m = m.merge(tot, on='date')
-    m['prop'] = m['count']/m['total']
+    m = cube_slice(emotion_counts, 'emotions', yr)
     fig = px.bar(
         m, x='date', y='prop', color='label',
         labels={'prop':'Proportion'}, color_discrete_map=custom_colors
@@ -215,10 +257,7 @@ def get_proportion_bar(yr):
     return fig
 
 def get_count_bar(yr):
-    d = df_emotions[df_emotions['date'].dt.year==yr]
-    m = d.groupby([d['date'].dt.to_period('M'),'label'])\
-         .size().reset_index(name='count')
-    m['date'] = m['date'].dt.to_timestamp()
+    m = cube_slice(emotion_counts, 'emotions', yr)
     fig = px.bar(
         m, x='date', y='count', color='label',
         labels={'count':'Emotion Count'}, color_discrete_map=custom_colors
@@ -236,13 +275,7 @@ def get_count_bar(yr):
     return fig
 
 def get_top10_counts(yr):
-    d = df_top_10_extraction[df_top_10_extraction['date'].dt.year==yr]
-    m = d.groupby([d['date'].dt.to_period('M'),'label'])\
-         .size().reset_index(name='count')
-    m['date'] = m['date'].dt.to_timestamp()
-    tot = m.groupby('date')['count'].sum().reset_index(name='total')
-    m = m.merge(tot, on='date')
-    m['prop'] = m['count']/m['total']
+    m = cube_slice(emotion_counts, 'top_10_extraction', yr)
     fig = px.bar(
         m, x='date', y='count', color='label',
         labels={'count':'Emotion Count'}, color_discrete_map=custom_colors
@@ -261,13 +294,7 @@ def get_top10_counts(yr):
     return fig
 
 def get_top10_props(yr):
-    d = df_top_10_extraction[df_top_10_extraction['date'].dt.year==yr]
-    m = d.groupby([d['date'].dt.to_period('M'),'label'])\
-         .size().reset_index(name='count')
-    m['date'] = m['date'].dt.to_timestamp()
-    tot = m.groupby('date')['count'].sum().reset_index(name='total')
-    m = m.merge(tot, on='date')
-    m['prop'] = m['count']/m['total']
+    m = cube_slice(emotion_counts, 'top_10_extraction', yr)
     fig = px.bar(
         m, x='date', y='prop', color='label',
         labels={'prop':'Proportion'}, color_discrete_map=custom_colors
@@ -311,11 +338,40 @@ with tabs[0]:
           - Celebrate mid‑trail joy peaks with planned photo stops.  
           - Prepare mentally for end‑section fatigue before you hit it.
           """)
-        dfy = df_top_10[df_top_10['date'].dt.year == selected_year]
-        for anon in sorted(dfy['hiker_anon'].unique()):
-            dfo = dfy[dfy['hiker_anon'] == anon]
-            st.subheader(anon)
-            st.plotly_chart(create_hiker_graph(dfo, anon, selected_year), use_container_width=True)
+        hikers = sorted((anon for yr, anon in daily_emotions if yr == selected_year),
+                        key=lambda anon: int(anon.split()[-1]))
+        mode = st.radio("View", ["One chart per hiker", "All hikers in one chart"], horizontal=True)
+        search_col, size_col = st.columns([3, 1])
+        search = search_col.text_input("🔎 Find a hiker", placeholder="e.g. Hiker 11")
+        page_size = size_col.selectbox("Per page", [5, 10, 25], index=1,
+                                       disabled=mode != "One chart per hiker")
+        if search.strip():
+            needle = search.strip().lower()
+            hikers = [anon for anon in hikers if needle in anon.lower()]
+
+        if mode == "All hikers in one chart":
+            if hikers:
+                st.plotly_chart(create_journeys_heatmap(tuple(hikers), selected_year, workbook_signatures),
+                                use_container_width=True)
+            else:
+                st.info("No hikers match the search.")
+        else:
+            # Only the visible hikers' figures are built; "Load more" extends the
+            # list and resets whenever the year, search or page size changes
+            view = (selected_year, search.strip().lower(), page_size)
+            if st.session_state.get('journeys_view') != view:
+                st.session_state['journeys_view'] = view
+                st.session_state['journeys_shown'] = page_size
+            shown = st.session_state['journeys_shown']
+
+            st.caption(f"Showing {min(shown, len(hikers))} of {len(hikers)} hikers")
+            for anon in hikers[:shown]:
+                st.subheader(anon)
+                st.plotly_chart(create_hiker_graph(anon, selected_year, workbook_signatures),
+                                use_container_width=True)
+            if shown < len(hikers) and st.button("Load more hikers"):
+                st.session_state['journeys_shown'] = shown + page_size
+                st.rerun()
     
     with col2:
         with st.container(border=True):
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from data import group_player
+from data.group_player import SCALE, _encode, decode_group, group_payload
+
+
+def _group(tracks):
+    """Encode ``tracks`` (hikers, days, 2; NaN when absent) as group_payload does."""
+    active = ~np.isnan(tracks[..., 0])
+    first = active.argmax(axis=1)
+    length = active.sum(axis=1)
+    values = np.round(np.nan_to_num(tracks) * SCALE).astype(np.int64)[active]
+    starts = np.concatenate([[0], np.cumsum(length)[:-1]])
+    return {
+        "spans": np.column_stack([first, length]).tolist(),
+        "lat": _encode(values[:, 0], starts),
+        "lon": _encode(values[:, 1], starts),
+    }
+
+
+def test_encode_decode_round_trip():
+    rng = np.random.default_rng(0)
+    days = 30
+    tracks = np.full((4, days, 2), np.nan)
+    for hiker, (first, length) in enumerate([(0, 30), (5, 10), (12, 1), (20, 10)]):
+        lat = 34.6 + np.cumsum(rng.uniform(0, 0.3, length))
+        lon = -84.2 + np.cumsum(rng.uniform(0, 0.3, length))
+        tracks[hiker, first:first + length] = np.column_stack([lat, lon])
+
+    decoded = decode_group(_group(tracks), days)
+
+    assert np.array_equal(np.isnan(decoded), np.isnan(tracks))
+    np.testing.assert_allclose(decoded, np.round(tracks * SCALE) / SCALE)
+
+
+def test_encode_restarts_at_every_member():
+    values = np.array([3400, 3410, 3405, 4000, 4002])
+    assert _encode(values, np.array([0, 3])) == [3400, 10, -5, 4000, 2]
+
+
+def test_group_payload_without_positions(monkeypatch):
+    empty = pd.DataFrame({
+        "normalized_name": pd.Series(dtype=str),
+        "date": pd.Series(dtype="datetime64[ns]"),
+        "Latitude": pd.Series(dtype=float),
+        "Longitude": pd.Series(dtype=float),
+    })
+    monkeypatch.setattr(group_player, "frame", lambda *args, **kwargs: empty)
+    communities = {"years": {"2021": {"partition": {"hiker": 1}}}}
+
+    payload = group_payload(communities, 2021, [1])
+
+    assert payload == {"start": None, "days": 0, "scale": SCALE, "groups": []}